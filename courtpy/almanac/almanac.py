@@ -73,7 +73,7 @@ class CPAlmanac(Almanac):
                                  'judge_demo' : float,
                                  'judge_ideo' : float,
                                  'panel_size' : int,
-                                 'judge_vote' : bool,
+                                 'judge_vote' : int,
                                  'agency' : 'category',
                                  'type' : bool,
                                  'politics' : float,
@@ -307,7 +307,7 @@ class CPAlmanac(Almanac):
                               'panel_ideo' : 'judge_name',
                               'panel_size' : 'sec_panel_judges',
                               'politics' : 'year'}
-        df[out_column] = df[match_column].astype(str).map(map_dict)
+        df[out_column] = df[match_column].map(map_dict)
         return df
 #
 #    def prepare(self):
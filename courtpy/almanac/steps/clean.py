@@ -8,6 +8,10 @@ import os
 from simplify import timer
 from simplify.almanac.steps import Clean
 
+from ...implements import RuleSet, UniqueMatcher
+from ...implements import clean_panel_column, explode_panel, panel_array
+from ...implements import YearTable, vote_codes
+
 
 @timer('Deep parsing and data wrangling')
 @dataclass
@@ -121,11 +125,15 @@ class CPClean(Clean):
                         party_pat, expand = True, n = 1))
         df[self.section_prefix + 'name2'].fillna('', inplace = True)
         for i in range(1, 3):
-            party_munger = ReMatch(file_path = self.munge_path,
-                                   out_type = self.data_type,
-                                   in_col = 'party_name' + str(i),
-                                   out_prefix = self.section_prefix,
-                                   out_suffix = str(i))
+            party_munger = UniqueMatcher(
+                    matcher = ReMatch(file_path = self.munge_path,
+                                      out_type = self.data_type,
+                                      in_col = 'party_name' + str(i),
+                                      out_prefix = self.section_prefix,
+                                      out_suffix = str(i)),
+                    in_col = 'party_name' + str(i),
+                    cache_key = (self.munge_path, self.data_type,
+                                 self.section_prefix, str(i)))
             df = party_munger.match(df = df)
         return df
 
@@ -137,13 +145,12 @@ class CPClean(Clean):
         name_prefix = 'judge_name'
         excess = self.excess_table['judge_excess']
         df = judges.clean_panel(df, self.source_col, excess)
-        df = df.apply(judges.judge_matcher,
-                      in_col = self.source_col,
-                      out_col = fixed_column,
-                      court_num_col = 'court_num',
-                      year_col = 'year',
-                      size_col = size_column,
-                      axis = 'columns')
+        df = judges.judge_matcher(df = df,
+                                  in_col = self.source_col,
+                                  out_col = fixed_column,
+                                  court_num_col = 'court_num',
+                                  year_col = 'year',
+                                  size_col = size_column)
         df = judges.explode_panel(df, fixed_column, name_prefix)
         return df
 
@@ -154,28 +161,18 @@ class CPClean(Clean):
         name_prefix = self.section_prefix + 'name'
         excess = self.excess_table['author_excess']
         df = judges.clean_panel(df, self.source_col, excess)
-        df = df.apply(judges.judge_matcher,
-                       in_col = self.source_col,
-                       out_col = fixed_column,
-                       court_num_col = 'court_num',
-                       year_col = 'year',
-                       axis = 'columns')
+        df = judges.judge_matcher(df = df,
+                                  in_col = self.source_col,
+                                  out_col = fixed_column,
+                                  court_num_col = 'court_num',
+                                  year_col = 'year')
         df = judges.explode_panel(df, fixed_column, name_prefix)
         return df
 
     def _clean_panel(self, df, in_col, excess):
         df = (df.pipe(no_double_space, in_col = in_col)
                 .pipe(no_breaks, in_col = in_col))
-        junk = '(@@|@ @|@ | @)'
-        df[in_col] = (df[in_col].str.upper()
-                                .str.strip()
-                                    .str.replace("[.']", '')
-                                    .str.replace(excess, '@')
-                                    .str.replace('[,()*;:]', '@')
-                                    .str.replace(junk, '@')
-                                    .str.replace(junk, '@')
-                                    .str.replace(junk, '@'))
-        df[in_col] = df[in_col].str.split('@', expand = False)
+        df[in_col] = clean_panel_column(column = df[in_col], excess = excess)
         return df
 
     def _judge_matcher(self, row, in_col, out_col, year_col, court_num_col,
@@ -207,11 +204,7 @@ class CPClean(Clean):
         return row
 
     def _explode_panel(self, df, in_col, prefix):
-        judge_df = df[in_col].apply(pd.Series)
-        judge_df = judge_df.rename(columns = lambda x : prefix + str(x + 1))
-        new_df = pd.concat([df[:], judge_df[:]], axis=1)
-        return new_df
-        return df
+        return explode_panel(df = df, in_col = in_col, prefix = prefix)
 
     def _munge_separate(self, df, judges):
         if self.settings['general']['verbose']:
@@ -224,22 +217,20 @@ class CPClean(Clean):
         dissent_name_prefix = self.section_prefix + 'dissent'
         excess = self.excess_table['concur_excess']
         df = judges.clean_panel(df, concur_source_col, excess)
-        df = df.apply(judges.judge_matcher,
-                      in_col = concur_source_col,
-                      out_col = concur_fixed_col,
-                      court_num_col = 'court_num',
-                      year_col = 'year',
-                      axis = 'columns')
+        df = judges.judge_matcher(df = df,
+                                  in_col = concur_source_col,
+                                  out_col = concur_fixed_col,
+                                  court_num_col = 'court_num',
+                                  year_col = 'year')
         df = judges.explode_panel(df, concur_fixed_col, concur_name_prefix)
         df = judges.clean_panel(df,
                                 dissent_source_col,
                                 excess)
-        df = df.apply(judges.judge_matcher,
-                      in_col = dissent_source_col,
-                      out_col = dissent_fixed_col,
-                      court_num_col = 'court_num',
-                      year_col = 'year',
-                      axis = 'columns')
+        df = judges.judge_matcher(df = df,
+                                  in_col = dissent_source_col,
+                                  out_col = dissent_fixed_col,
+                                  court_num_col = 'court_num',
+                                  year_col = 'year')
         df = judges.explode_panel(df, dissent_fixed_col, dissent_name_prefix)
         return df
 
@@ -256,7 +247,11 @@ class CPClean(Clean):
                         'references' : ['admin_cites', 'statute_cites',
                                         'case_cites', 'other_cites']}
         self.munge_path = os.path.join(self.dicts_path, self.munge_file)
+        self.rules_path = os.path.join(self.dicts_path, 'combiner_rules.csv')
         self.sec_prefix = self.section + '_'
+        if self.section in ['type', 'outcome']:
+            self.section_rules = RuleSet(file_path = self.rules_path,
+                                         section = self.section)
         if self.section == 'type':
             self.section_combiner = self.determine_type
         elif self.section == 'judge_vote':
@@ -270,12 +265,12 @@ class CPClean(Clean):
         elif self.section == 'refer':
             self.section_combiner = self.unpack_references
 
-    def determine_type(self, df):
+    def determine_type(self, batch):
         if self.settings['general']['verbose']:
             print('Determining precedental status')
-        df[self.sec_prefix + 'published'] = (
-                np.where(df['notice_unpub_rule'], False,
-                    np.where(df['sec_cite'].str.contains('F\. ?(2d|3d)',
+        batch[self.sec_prefix + 'published'] = (
+                np.where(batch['notice_unpub_rule'], False,
+                    np.where(batch['sec_cite'].str.contains('F\. ?(2d|3d)',
                              flags = re.IGNORECASE), True, False)))
         if self.settings['general']['verbose']:
             print('Classifying cases as criminal or civil')
@@ -287,216 +282,70 @@ class CPClean(Clean):
                                    in_col = 'sec_history',
                                    out_type = self.data_type,
                                    out_prefix = 'temp_history_')
-        df = crim_civ_docket.match(df = df)
-        df = crim_civ_history.match(df = df)
-        crim_issues = [col for col in df if col.startswith('crim_')]
-        df['temp_crim_issue'] = np.where(
-                df[crim_issues].any(axis = 1), True, False)
-        df[self.sec_prefix + 'criminal'] = (
-                np.where((df['temp_docket_crim']
-                   & (df['party_us1'] | df['party_us2'])),
-                   True,
-                   np.where((df['temp_history_crim']
-                   & (df['party_us1'] | df['party_us2'])),
-                   True,
-                   np.where(df['counsel_us_atty']
-                   & (df['party_us1'] | df['party_us2']),
-                   True,
-                   np.where(df['temp_crim_issue']
-                   & (df['party_us1'] | df['party_us2']),
-                   True, False)))))
-        df['party_pros1'] = (
-                np.where(df[self.sec_prefix + 'criminal']
-                         & df['party_us1'], True, False))
-        df['party_crimd2'] = (
-                np.where(df['party_pros1'], True, False))
-        df['party_pros2'] = (
-                np.where(df[self.sec_prefix + 'criminal']
-                         & df['party_us2'], True, False))
-        df['party_crimd1'] = (
-                np.where(df['party_pros2'], True, False))
-        df['party_civp1'] = (
-                np.where(~df[self.sec_prefix + 'criminal']
-                & df['party_plaint1'], True, False))
-        df['party_civd2'] = (
-                np.where(df['party_plaint1'], True, False))
-        df['party_civp2'] = (
-                np.where(~df[self.sec_prefix + 'criminal']
-                & df['party_plaint2'], True, False))
-        df['party_civd1'] = (
-                np.where(df['party_civp2'], True, False))
-        return df
+        batch.df = crim_civ_docket.match(df = batch.df)
+        batch.df = crim_civ_history.match(df = batch.df)
+        crim_issues = [col for col in batch if col.startswith('crim_')]
+        batch['temp_crim_issue'] = np.where(
+                batch[crim_issues].any(axis = 1), True, False)
+        self.section_rules.apply(batch)
+        return batch
 
-    def match_votes(self, df):
+    def match_votes(self, batch):
         if self.settings['general']['verbose']:
             print('Determining judge voting alignments')
-        judge_cols = [col for col in df if col.startswith('judge_name')]
+        judge_cols = [col for col in batch if col.startswith('judge_name')]
+        author_cols = [col for col in batch if col.startswith('author_name')]
+        votes = vote_codes(
+                names = batch[judge_cols].to_numpy(dtype = object),
+                authors = batch[author_cols].to_numpy(dtype = object),
+                concurs = panel_array(batch['temp_concur']),
+                dissents = panel_array(batch['temp_dissent']))
         for i, col in enumerate(judge_cols):
-            df[self.sec_prefix + 'author' + str(i + 1)] = (
-                np.where(df[col].isin(df['author_name1']
-                    .astype(str)), True, False))
-            df[self.sec_prefix + 'concur' + str(i + 1)] = (
-                np.where(df[col].isin(df['temp_concur']
-                    .astype(str)), True, False))
-            df[self.sec_prefix + 'dissent' + str(i + 1)] = (
-                np.where(df[col].isin(df['temp_dissent']
-                    .astype(str)), True, False))
-        return df
+            batch[self.sec_prefix + 'code' + str(i + 1)] = votes[:, i]
+        return batch
 
-    def aggregate_votes(self, df):
+    def aggregate_votes(self, batch):
         pass
-        return df
+        return batch
 
-    def determine_agency(self, df):
+    def determine_agency(self, batch):
         if self.settings['general']['verbose']:
             print('Determining executive agency involvement')
-        agencies = ReMatch(file_path = self.munge_path,
-                           out_type = self.data_type)
-        df = agencies.match(df = df,
-                            in_col = 'party_name1',
-                            out_col = 'temp_agency_party_1',
-                            default = 'None')
-        df = agencies.match(df = df,
-                            in_col = 'party_name2',
-                            out_col = 'temp_agency_party_2',
-                            default = 'None')
-        df = agencies.match(df = df,
-                            in_col = 'sec_history',
-                            out_col = 'temp_agency_history',
-                            default = 'None')
-        df[self.sec_prefix + 'name'] = np.where(
-                df['temp_agency_history'] != 'None', df['temp_agency_history'],
-                    np.where(df['temp_agency_party_1'] != 'None',
-                             df['temp_agency_party_1'],
-                             np.where(df['temp_agency_party_2'] != 'None',
-                                      df['temp_agency_party_2'], 'None')))
-        return df
+        agencies = UniqueMatcher(
+                matcher = ReMatch(file_path = self.munge_path,
+                                  out_type = self.data_type),
+                cache_key = (self.munge_path, self.data_type))
+        batch.df = agencies.match(df = batch.df,
+                                  in_col = 'party_name1',
+                                  out_col = 'temp_agency_party_1',
+                                  default = 'None')
+        batch.df = agencies.match(df = batch.df,
+                                  in_col = 'party_name2',
+                                  out_col = 'temp_agency_party_2',
+                                  default = 'None')
+        batch.df = agencies.match(df = batch.df,
+                                  in_col = 'sec_history',
+                                  out_col = 'temp_agency_history',
+                                  default = 'None')
+        batch[self.sec_prefix + 'name'] = np.where(
+                batch['temp_agency_history'] != 'None',
+                batch['temp_agency_history'],
+                    np.where(batch['temp_agency_party_1'] != 'None',
+                             batch['temp_agency_party_1'],
+                             np.where(batch['temp_agency_party_2'] != 'None',
+                                      batch['temp_agency_party_2'], 'None')))
+        return batch
 
-    def linked_cols(self, df, in_col, out_col):
-        df[out_col] = np.where(df[in_col], True, df[out_col])
-        return df
-
-    def chicken_dinner(self, df):
-        win_below = 'temp_won_below'
-        win_appeal = 'temp_win_appeal'
-        crim_d_appeal = 'type_crim_d_appeal'
-        civ_d_appeal = 'type_civ_d_appeal'
-        crim_d_win = 'crim_d_win'
-        civ_d_win = 'civ_d_win'
-        crim_p_win = 'crim_p_win'
-        civ_p_win = 'civ_p_win'
-        if self.settings['general']['verbose']:
-            print('Completing party variable coding')
-        df = self.linked_cols(df, 'party_resp2',
-                              'party_petit1')
-        df = self.linked_cols(df, 'party_resp1',
-                              'party_petit2')
-        df = self.linked_cols(df, 'party_appnt1',
-                              'party_appee2')
-        df = self.linked_cols(df, 'party_appnt2',
-                              'party_appee1')
-        df = self.linked_cols(df, 'party_plaint2',
-                              'party_defend1')
-        df = self.linked_cols(df, 'party_plaint1',
-                              'party_defend2')
+    def chicken_dinner(self, batch):
         if self.settings['general']['verbose']:
-            print('Determining case outcomes')
-        df[self.sec_prefix + 'reversal'] = (
-                np.where(df['disposition_reverse']
-                         | df['disposition_vacate']
-                         | df['disposition_remand'],
-                         True,
-                         np.where(df['disposition_op_reversed']
-                                  | df['disposition_op_vacate']
-                                  | df['disposition_op_remand'],
-                                  True, False)))
-        for i in range(1, 3):
-            df[win_below + str(i)] = (
-                    np.where((df['party_petit' + str(i)]
-                              | df['party_appnt' + str(i)])
-                              & (~df['party_resp' + str(i)])
-                              & (~df['party_appee' + str(i)]),
-                              True, False))
-            df[win_appeal + str(i)] = (
-                    np.where((df[self.sec_prefix + 'reversal']
-                              & ~df[win_below + str(i)])
-                              | (~df[self.sec_prefix + 'reversal']
-                              & df[win_below + str(i)]),
-                              True, False))
-        df[crim_d_appeal] = (
-                np.where(df['type_criminal']
-                          & ((df['party_appnt1']
-                              & df['party_crimd1'])
-                             | (df['party_appnt2']
-                                & df['party_crimd2'])), True, False))
-        df[civ_d_appeal] = (
-                np.where(~df['type_criminal']
-                          & ((df['party_appnt1']
-                              & df['party_civd1'])
-                             | (df['party_appnt2']
-                                & df['party_civd2'])), True, False))
-        df[self.sec_prefix + 'reversal_' + crim_d_win] = (
-                np.where(df['type_criminal']
-                          & ((df[self.sec_prefix + 'reversal']
-                              & df['party_appnt1']
-                              & df['party_crimd1'])
-                             | (df[self.sec_prefix + 'reversal']
-                                & df['party_appnt2']
-                                & df['party_crimd2'])
-                             | (~df[self.sec_prefix + 'reversal']
-                                & df['party_appee1']
-                                & df['party_crimd1'])
-                             | (~df[self.sec_prefix + 'reversal']
-                                & df['party_appee2']
-                                & df['party_crimd2'])), True, False))
-        df[self.sec_prefix + 'reversal_' + civ_d_win] = (
-                np.where(~df['type_criminal']
-                          & ((df[self.sec_prefix + 'reversal']
-                              & df['party_appnt1']
-                              & df['party_civd1'])
-                             | (df[self.sec_prefix + 'reversal']
-                                & df['party_appnt2']
-                                & df['party_civd2'])
-                             | (~df[self.sec_prefix + 'reversal']
-                                & df['party_appee1']
-                                & df['party_civd1'])
-                             | (~df[self.sec_prefix + 'reversal']
-                                & df['party_appee2']
-                                & df['party_civd2'])), True, False))
-        df[self.sec_prefix + 'reversal_' + crim_p_win] = (
-                np.where(df['type_criminal']
-                          & ((df[self.sec_prefix + 'reversal']
-                              & df['party_appnt1']
-                              & df['party_pros1'])
-                             | (df[self.sec_prefix + 'reversal']
-                                & df['party_appnt2']
-                                & df['party_pros2'])
-                             | (~df[self.sec_prefix + 'reversal']
-                                & df['party_appee1']
-                                & df['party_pros1'])
-                             | (~df[self.sec_prefix + 'reversal']
-                                & df['party_appee2']
-                                & df['party_pros2'])), True, False))
-        df[self.sec_prefix + 'reversal_' + civ_p_win] = (
-                np.where(~df['type_criminal']
-                          & ((df[self.sec_prefix + 'reversal']
-                              & df['party_appnt1']
-                              & df['party_civp1'])
-                             | (df[self.sec_prefix + 'reversal']
-                                & df['party_appnt2']
-                                & df['party_civp2'])
-                             | (~df[self.sec_prefix + 'reversal']
-                                & df['party_appee1']
-                                & df['party_civp1'])
-                             | (~df[self.sec_prefix + 'reversal']
-                                & df['party_appee2']
-                                & df['party_civp2'])), True, False))
-        return df
+            print('Completing party variable coding and determining case '
+                  'outcomes')
+        self.section_rules.apply(batch)
+        return batch
 
-    def unpack_references(self, df):
+    def unpack_references(self, batch):
         pass
-        df = df
-        return df
+        return batch
 
     def initialize_judges(self, cases = None):
         if self.jurisdiction == 'federal':
@@ -521,9 +370,23 @@ class CPClean(Clean):
                                            data_type = row['data_type'],
                                            munge_file = row['munge_file']))
         for combiner in self.combiners:
-            df = combiner.section_combiner(df)
+            with self._column_batch(cases = cases, df = df,
+                                    name = combiner.section) as batch:
+                combiner.section_combiner(batch)
+            df = batch.df
         return df
 
+    def _column_batch(self, cases, df, name):
+        """Returns a column batch for df which reports its time (and its
+        peak memory if track_memory is set in the general settings).
+        """
+        return cases.column_batch(
+                df = df,
+                name = name,
+                verbose = self.settings['general']['verbose'],
+                track_memory = self.settings['general'].get('track_memory',
+                                                            False))
+
     def add_externals(self, df = None, cases = None):
         self.externals = []
         external_df = cases.rules.loc[cases.rules['external']]
@@ -531,10 +394,26 @@ class CPClean(Clean):
             self.externals.append(External(section = row['key'],
                                            paths = self.paths,
                                            settings = self.settings))
+        year_sections = ['executive', 'legislature', 'judiciary']
+        year_table = YearTable(
+                start_year = self.settings['general']['start_year'],
+                end_year = self.settings['general']['end_year'])
         for external in self.externals:
-            if external.section == 'judge_exp':
-                    df = external.section_adder(df = df,
-                                            judges = self.judges)
-            else:
-                df = external.section_adder(df)
+            if external.section in year_sections:
+                year_table.add_dicts(df = external.df,
+                                     dicts = external._dicts)
+                continue
+            with self._column_batch(cases = cases, df = df,
+                                    name = external.section) as batch:
+                if external.section == 'judge_exp':
+                    batch.df = external.section_adder(df = batch.df,
+                                                      judges = self.judges)
+                else:
+                    batch.df = external.section_adder(batch.df)
+            df = batch.df
+        if year_table.columns:
+            with self._column_batch(cases = cases, df = df,
+                                    name = 'politics') as batch:
+                batch.df = year_table.apply(batch.df, year_col = 'year')
+            df = batch.df
         return df
@@ -7,6 +7,7 @@ import csv
 from dataclasses import dataclass
 import os
 import re
+import shutil
 
 import numpy as np
 import pandas as pd
@@ -15,6 +16,9 @@ from shutil import copyfile
 from simplify.implements import ReSearch
 from simplify.managers import Technique
 
+from ....implements import clean_panel_column, explode_panel, hash_file
+from ....implements import panel_tensor
+
 
 @dataclass
 class Judges(Technique):
@@ -44,51 +48,62 @@ class Judges(Technique):
     def clean_panel(self, df, in_col, excess):
         df = (df.pipe(self.no_double_space, in_col = in_col)
                 .pipe(self.no_breaks, in_col = in_col))
-        junk = '(@@|@ @|@ | @)'
-        df[in_col] = (df[in_col].str.upper()
-                                .str.strip()
-                                    .str.replace("[.']", '')
-                                    .str.replace(excess, '@')
-                                    .str.replace('[,()*;:]', '@')
-                                    .str.replace(junk, '@')
-                                    .str.replace(junk, '@')
-                                    .str.replace(junk, '@'))
-        df[in_col] = df[in_col].str.split('@', expand = False)
+        df[in_col] = clean_panel_column(column = df[in_col], excess = excess)
         return df
 
-    def judge_matcher(self, row, in_col, out_col, year_col, court_num_col,
+    def judge_matcher(self, df, in_col, out_col, year_col, court_num_col,
                       size_col = None):
-        final_list = []
-        raw_list = row[in_col]
-        cleaned_list = [x for x in raw_list if x]
-        cleaned_list = [x.strip() for x in cleaned_list]
-        for name in cleaned_list:
-            name1 = self.convert_judge_name(row[year_col],
-                                            row[court_num_col], name, 1)
-            name2 = self.convert_judge_name(row[year_col],
-                                            row[court_num_col], name, 2)
-            if name1 in self.names_dict_list[0]:
-                final_list.append(self.names_dict_list[0].get(name1))
-            elif name1 in self.names_dict_list[1]:
-                final_list.append(self.names_dict_list[1].get(name1))
-            elif name2 in self.names_dict_list[2]:
-                final_list.append(self.names_dict_list[2].get(name2))
-            elif name2 in self.names_dict_list[3]:
-                final_list.append(self.names_dict_list[3].get(name2))
-            elif name in self.names_dict_list[4]:
-                final_list.append(self.names_dict_list[4].get(name))
-        final_list = list(unique_everseen(final_list))
-        final_list.sort()
-        row[out_col] = final_list
-        if size_col and final_list:
-            row[size_col] = len(final_list)
-        return row
+        """Matches the names in each list in in_col with judges' full names
+        and stores the sorted, unique matches for each case in out_col.
+
+        Each name is matched by court and year, circuit and year, year, and
+        then name alone. Rather than checking each name in turn, all names are
+        exploded into a long table with integer court and year keys and each
+        tier is resolved for every remaining name at once with a hash join
+        against the tables made by make_name_dicts.
+        """
+        names = df[in_col].reset_index(drop = True).explode()
+        names = names[names.notna() & (names != '')].str.strip()
+        rows = names.index.to_numpy()
+        years = df[year_col].to_numpy().astype(np.int64)[rows]
+        courts = df[court_num_col].to_numpy().astype(np.int64)[rows]
+        codes = self.name_perms_index.get_indexer(names.to_numpy())
+        token_keys = [courts * 10000 + years, courts * 10000 + years, years,
+                      np.zeros(len(rows), dtype = np.int64)]
+        perms_count = len(self.name_perms_index)
+        full_names = np.empty(len(rows), dtype = object)
+        unmatched = codes >= 0
+        for (tier_index, tier_codes), keys in zip(self.name_tiers,
+                                                  token_keys):
+            todo = np.flatnonzero(unmatched)
+            positions = tier_index.get_indexer(
+                    keys[todo] * perms_count + codes[todo])
+            found = positions >= 0
+            full_names[todo[found]] = self.judge_names[
+                    tier_codes[positions[found]]]
+            unmatched[todo[found]] = False
+        matched = (codes >= 0) & ~unmatched
+        matches = (pd.DataFrame({'row' : rows[matched],
+                                 'name' : full_names[matched]})
+                     .drop_duplicates()
+                     .sort_values(by = ['row', 'name'])
+                     .groupby('row')['name']
+                     .agg(list))
+        final_lists = [[] for i in range(len(df))]
+        for row, final_list in zip(matches.index, matches.values):
+            final_lists[row] = final_list
+        df[out_col] = final_lists
+        if size_col:
+            sizes = np.array([len(x) for x in final_lists])
+            if size_col in df:
+                existing = df[size_col].to_numpy()
+            else:
+                existing = np.full(len(df), np.nan)
+            df[size_col] = np.where(sizes > 0, sizes, existing)
+        return df
 
     def explode_panel(self, df, in_col, prefix):
-        judge_df = df[in_col].apply(pd.Series)
-        judge_df = judge_df.rename(columns = lambda x : prefix + str(x + 1))
-        new_df = pd.concat([df[:], judge_df[:]], axis=1)
-        return new_df
+        return explode_panel(df = df, in_col = in_col, prefix = prefix)
 
 @dataclass
 class FederalJudges(Judges):
@@ -283,8 +298,7 @@ class FederalJudges(Judges):
                            axis = 'columns')
                      .set_index('nid')
                      .pipe(self.name_changes)
-                     .apply(self.name_perms,
-                           axis = 'columns')
+                     .pipe(self.name_perms)
                      .reset_index()
                      .drop(columns = self.col_drops))
         self.df.to_csv(self.fjc_bios,
@@ -382,30 +396,27 @@ class FederalJudges(Judges):
             return year.astype(int).astype(str) + name
 
     @staticmethod
-    def name_perms(row):
+    def name_perms(df):
         """
         Constructs a consistent set of names for each judge with different
         ordering and formatting.
         """
-        row['first_name'] = re.sub("\.|\,|\[|\]|\'", '', row['first_name'])
-        row['last_name'] = re.sub("\.|\,|\[|\]|\'", '', row['last_name'])
-        row['middle_name'] = re.sub("\.|\,|\[|\]|\'", '', row['middle_name'])
-        first = row['first_name'].strip().upper()
-        first_init = first[0].upper()
-        middle = row['middle_name'].strip().upper()
-        if middle:
-            middle_init = middle[0].upper()
-        else:
-            middle_init = ''
-        last = row['last_name'].strip().upper()
-        row['name_perm1'] = f'{first} {middle} {last}'
-        row['name_perm2'] = f'{first} {middle_init} {last}'
-        row['name_perm3'] = f'{first} {last}'
-        row['name_perm4'] = f'{first_init} {middle} {last}'
-        row['name_perm5'] = f'{first_init} {middle_init} {last}'
-        row['name_perm6'] = f'{first_init} {last}'
-        row['name_perm7'] = f'{last}'
-        return row
+        for column in ['first_name', 'last_name', 'middle_name']:
+            df[column] = df[column].str.replace("\.|\,|\[|\]|\'", '',
+                                                regex = True)
+        first = df['first_name'].str.strip().str.upper()
+        first_init = first.str[:1]
+        middle = df['middle_name'].str.strip().str.upper()
+        middle_init = middle.str[:1]
+        last = df['last_name'].str.strip().str.upper()
+        df['name_perm1'] = first + ' ' + middle + ' ' + last
+        df['name_perm2'] = first + ' ' + middle_init + ' ' + last
+        df['name_perm3'] = first + ' ' + last
+        df['name_perm4'] = first_init + ' ' + middle + ' ' + last
+        df['name_perm5'] = first_init + ' ' + middle_init + ' ' + last
+        df['name_perm6'] = first_init + ' ' + last
+        df['name_perm7'] = last
+        return df
 
     def reshape_names(self):
         self.df = self.df[['start_year', 'end_year', 'court_num',
@@ -421,51 +432,124 @@ class FederalJudges(Judges):
         self.df = pd.wide_to_long(self.df, stubnames = 'name_perm',
                                   i = 'nindex', j = 'nperm')
         self.df = self.df[self.df.name_perm != '']
+        """
+        Expands each row to one row for each year from start_year to two
+        years after end_year (within the years in settings). Rows are repeated
+        in their original order with years in ascending order.
+        """
+        years = np.arange(self.settings['general']['start_year'],
+                          self.settings['general']['end_year'])
+        start_years = self.df['start_year'].to_numpy()[:, np.newaxis]
+        end_years = self.df['end_year'].to_numpy()[:, np.newaxis]
+        active = (start_years <= years) & ((years - 2) <= end_years)
+        row_nums, year_nums = np.nonzero(active)
+        self.df = self.df.iloc[row_nums].assign(year = years[year_nums])
         with open(self.fjc_names, mode = 'w', newline = '') as output_file:
             writer = csv.writer(output_file)
             writer.writerow(self.df.columns.values.tolist())
-            for i, row in self.df.iterrows():
-                for j in range(self.settings['general']['start_year'],
-                               self.settings['general']['end_year']):
-                    if (row['start_year'] <= j
-                        and (j - 2) <= row['end_year']):
-                        row['year'] = j
-                        row2 = row
-                        writer.writerow(row2)
+            writer.writerows(self.df.astype(object).itertuples(index = False))
             return
 
     def make_name_dicts(self):
+        """Loads the tables used by judge_matcher from the cached name index
+        for the current fjc_names.csv and years. If there is no cached index,
+        the tables are made from fjc_names.csv and cached.
+        """
         self.name_cols = {'year' : int, 'full_name' : str, 'court_num' : int,
                           'circuit_num' : int, 'name_perm' : str}
         self.name_cols_list = list(self.name_cols.keys())
-        self.names_dict_list = []
-        self.names = pd.read_csv(self.fjc_names,
-                                 usecols = self.name_cols_list,
-                                 index_col = False,
-                                 encoding = self.settings['files']['encoding'])
-        self.names['name_perm'] = self.names['name_perm'].str.upper()
-        self.names['concat_name1'] = self.convert_judge_name_series(
-                  self.names['year'], self.names['court_num'],
-                  self.names['name_perm'], dict_type = 1)
-        self.names['concat_name2'] = self.convert_judge_name_series(
-                  self.names['year'], self.names['circuit_num'],
-                  self.names['name_perm'], dict_type = 1)
-        self.names['concat_name3'] = self.convert_judge_name_series(
-                  self.names['year'], self.names['court_num'],
-                  self.names['name_perm'], dict_type = 2)
-        self.names['concat_name4'] = self.convert_judge_name_series(
-                  self.names['year'], self.names['circuit_num'],
-                  self.names['name_perm'], dict_type = 2)
-        self.names_dict_list.append(
-                self.names.set_index('concat_name1').to_dict()['full_name'])
-        self.names_dict_list.append(
-                self.names.set_index('concat_name2').to_dict()['full_name'])
-        self.names_dict_list.append(
-                self.names.set_index('concat_name3').to_dict()['full_name'])
-        self.names_dict_list.append(
-                self.names.set_index('concat_name4').to_dict()['full_name'])
-        self.names_dict_list.append(
-                self.names.set_index('name_perm').to_dict()['full_name'])
+        index_folder = self._name_index_folder()
+        if os.path.exists(index_folder):
+            self.load_name_tiers(folder = index_folder)
+        else:
+            self.names = pd.read_csv(
+                    self.fjc_names,
+                    usecols = self.name_cols_list,
+                    index_col = False,
+                    encoding = self.settings['files']['encoding'])
+            self.names['name_perm'] = self.names['name_perm'].str.upper()
+            self.names = self.names.dropna(subset = ['name_perm'])
+            self.make_name_tiers()
+            self.save_name_tiers(folder = index_folder)
+        return self
+
+    def _name_index_folder(self):
+        """Returns the folder for the name index of the current fjc_names.csv
+        and years.
+        """
+        key = '_'.join([hash_file(self.fjc_names)[:16],
+                        str(self.settings['general']['start_year']),
+                        str(self.settings['general']['end_year'])])
+        return os.path.join(self.federal_judicial_path, 'fjc_names_index',
+                            key)
+
+    def make_name_tiers(self):
+        """Makes the tables used by judge_matcher to match names by court and
+        year, circuit and year, year, and name alone.
+
+        Each table is a pandas index of integer keys combining the court or
+        circuit number, the year, and a code for the name permutation, along
+        with an array of codes for the full names in judge_names. When a key
+        appears more than once, the last full name is kept.
+        """
+        self.name_perms_index = pd.Index(self.names['name_perm'].unique())
+        codes = self.name_perms_index.get_indexer(self.names['name_perm'])
+        perms_count = len(self.name_perms_index)
+        name_codes, judge_names = pd.factorize(self.names['full_name'])
+        self.judge_names = np.append(np.asarray(judge_names, dtype = object),
+                                     np.nan)
+        years = self.names['year'].to_numpy().astype(np.int64)
+        courts = self.names['court_num'].to_numpy().astype(np.int64)
+        circuits = self.names['circuit_num'].to_numpy().astype(np.int64)
+        tier_keys = [courts * 10000 + years, circuits * 10000 + years, years,
+                     np.zeros(len(years), dtype = np.int64)]
+        self.name_tiers = []
+        for keys in tier_keys:
+            tier = pd.Series(name_codes.astype(np.int32),
+                             index = keys * perms_count + codes)
+            tier = tier[~tier.index.duplicated(keep = 'last')]
+            self.name_tiers.append((tier.index, tier.to_numpy()))
+        return self
+
+    def load_name_tiers(self, folder):
+        """Loads the tables made by make_name_tiers from folder. Integer
+        arrays are memory-mapped.
+        """
+        self.name_perms_index = pd.Index(
+                np.load(os.path.join(folder, 'name_perms.npy')).astype(object))
+        self.judge_names = np.append(
+                np.load(os.path.join(folder, 'judge_names.npy')).astype(object),
+                np.nan)
+        self.name_tiers = []
+        tiers_count = len([file_name for file_name in os.listdir(folder)
+                           if file_name.startswith('keys')])
+        for i in range(tiers_count):
+            keys = np.load(os.path.join(folder, 'keys' + str(i) + '.npy'),
+                           mmap_mode = 'r')
+            codes = np.load(os.path.join(folder, 'codes' + str(i) + '.npy'),
+                            mmap_mode = 'r')
+            self.name_tiers.append((pd.Index(keys), codes))
+        return self
+
+    def save_name_tiers(self, folder):
+        """Saves the tables made by make_name_tiers to folder and removes
+        name indexes for other versions of fjc_names.csv or years.
+        """
+        parent = os.path.dirname(folder)
+        if os.path.exists(parent):
+            shutil.rmtree(parent)
+        temp_folder = folder + '_tmp'
+        os.makedirs(temp_folder)
+        np.save(os.path.join(temp_folder, 'name_perms.npy'),
+                self.name_perms_index.to_numpy().astype(str))
+        np.save(os.path.join(temp_folder, 'judge_names.npy'),
+                self.judge_names[:-1].astype(str))
+        for i, (keys, codes) in enumerate(self.name_tiers):
+            np.save(os.path.join(temp_folder, 'keys' + str(i) + '.npy'),
+                    keys.to_numpy())
+            np.save(os.path.join(temp_folder, 'codes' + str(i) + '.npy'),
+                    codes)
+        os.replace(temp_folder, folder)
         return self
 
     def make_bios_dict(self):
@@ -478,8 +562,8 @@ class FederalJudges(Judges):
         self.bios_df['senior_year'] = (
                 pd.to_datetime(self.bios_df['senior_status_date'],
                                errors = 'coerce').dt.year)
-        self.bios_df['senior_year'].fillna(0, inplace = True)
-        self.bios_df['senior_year'] = self.bios_df['senior_year'].astype(int)
+        self.bios_df['senior_year'] = (
+                self.bios_df['senior_year'].fillna(0).astype(int))
         self.bios_cols.pop('senior_status_date')
         self.bios_cols.update({'senior_year' : int})
         self.bios_df['jcs'] = self.bios_df['jcs'].fillna(0)
@@ -501,74 +585,77 @@ class FederalJudges(Judges):
         return self
 
     def add_bios(self, df, judges):
+        """Adds biographical data for the judge in each judge_name column and
+        panel totals of each biographical attribute.
+
+        Each judge is looked up in the biography table once, as a position in
+        a (case, slot) array, and all of the new columns are added to df with
+        a single concat. Panel totals are sums over the slot axis of a
+        PanelTensor of the new columns. Empty values in numeric and boolean
+        biography columns are treated as missing.
+        """
         if self.settings['general']['verbose']:
             print('Adding judicial biography data')
         self.sec_prefix = self.section + '_'
         judges.make_bios_dict()
-        judge_cols = [col for col in df if col.startswith('judge_name')]
-        for i, i_col in enumerate(judge_cols):
-            for j, j_col in enumerate(judges.bios_cols_list):
-                if judges.bios_cols.get(j_col) == bool:
-                    prefix = 'judge_exp_'
-                elif judges.bios_cols.get(j_col) == float:
-                    prefix = 'judge_ideo_'
-                elif judges.bios_cols.get(j_col) == str:
-                    prefix = 'judge_attr_'
-                elif judges.bios_cols.get(j_col) == int:
-                    prefix = 'judge_demo_'
-                df[prefix + j_col + str(i + 1)] = (
-                    df['judge_name' + str(i + 1)]
-                        .map(judges.bios[j]))
-            df['judge_demo_age' + str(i + 1)] = (df['year']
-                - df['judge_demo_birth_year' + str(i + 1)])
-            df['judge_demo_senior_year' + str(i + 1)] = (
-                    df['judge_demo_senior_year' + str(i + 1)]
-                        .fillna(0).astype(int))
-            df['judge_exp_senior' + str(i + 1)] = (np.where(
-                    (df['judge_demo_senior_year' + str(i + 1)] > 0)
-                    & (df['judge_demo_senior_year' + str(i + 1)]
-                    <= df['year']), True, False))
-            df['judge_demo_court_num' + str(i + 1)].fillna(0, inplace = True)
-            df['judge_demo_court_num' + str(i + 1)] = (
-                    df['judge_demo_court_num' + str(i + 1)].astype(int))
-            df['judge_exp_designation' + str(i + 1)] = (
-                    np.where((df['judge_demo_court_num' + str(i + 1)]
-                             != df['court_num'].astype(int))
-                             & (df['judge_demo_court_num' + str(i + 1)] > 0),
-                             True, False))
-            df['judge_exp_district' + str(i + 1)] = (
-                    np.where(df['judge_demo_court_num' + str(i + 1)]
-                             > 100, True, False))
-        drop_prefixes = ['judge_demo_birth_year', 'judge_demo_senior_year',
-                         'judge_demo_circuit_num', 'judge_demo_court_num']
-        temp_list = []
-        drop_list = []
-        for pre in drop_prefixes:
-            temp_list = [i for i in df if pre in i]
-            drop_list.extend(temp_list)
-        for i in drop_list:
-                df.drop([col for col in df.columns if i in col],
-                        axis = 'columns', inplace = True)
-        remove_keys = ['birth_year', 'senior_year', 'circuit_num', 'court_num']
-        for key in remove_keys:
+        prefixes = {bool : 'judge_exp_', float : 'judge_ideo_',
+                    str : 'judge_attr_', int : 'judge_demo_'}
+        drop_keys = ['birth_year', 'senior_year', 'circuit_num', 'court_num']
+        slots = [str(i + 1) for i, col in enumerate(
+                [col for col in df if col.startswith('judge_name')])]
+        bios = (judges.bios_df.drop_duplicates(subset = 'full_name',
+                                               keep = 'last')
+                              .set_index('full_name'))
+        positions = bios.index.get_indexer(
+                df[['judge_name' + slot for slot in slots]]
+                    .to_numpy().ravel()).reshape(len(df), len(slots))
+        lookups = {key : pd.Series(bios[key].tolist())
+                   for key in judges.bios_cols_list}
+        for key, lookup in lookups.items():
+            if judges.bios_cols[key] == bool:
+                lookups[key] = lookup.where(lookup != '')
+            elif judges.bios_cols[key] in [int, float]:
+                lookups[key] = pd.to_numeric(lookup, errors = 'coerce')
+        year = df['year']
+        court_num = df['court_num'].astype(int)
+        new_cols = {}
+        for i, slot in enumerate(slots):
+            slot_cols = {key : pd.Series(
+                                 lookup.reindex(positions[:, i]).to_numpy(),
+                                 index = df.index)
+                         for key, lookup in lookups.items()}
+            for key, values in slot_cols.items():
+                if key not in drop_keys:
+                    new_cols[prefixes[judges.bios_cols[key]] + key + slot] = (
+                            values)
+            new_cols['judge_demo_age' + slot] = (
+                    year - slot_cols['birth_year'])
+            senior_year = slot_cols['senior_year'].fillna(0).astype(int)
+            new_cols['judge_exp_senior' + slot] = (
+                    (senior_year > 0) & (senior_year <= year))
+            judge_court = slot_cols['court_num'].fillna(0).astype(int)
+            new_cols['judge_exp_designation' + slot] = (
+                    (judge_court != court_num) & (judge_court > 0))
+            new_cols['judge_exp_district' + slot] = judge_court > 100
+        for key in drop_keys:
             judges.bios_cols.pop(key)
         judges.bios_cols.update({'age' : int, 'senior' : bool,
                                  'designation' : bool, 'district' : bool})
-        for key, value in judges.bios_cols.items():
+        judge_df = pd.DataFrame(new_cols, index = df.index)
+        stubs = [prefixes[value] + key
+                 for key, value in judges.bios_cols.items()]
+        totals = panel_tensor(judge_df, stubs).sum(stubs)
+        has_panel = (df['panel_size'] > 0).to_numpy()
+        panel_cols = {}
+        for stub, value in zip(stubs, judges.bios_cols.values()):
+            panel_totals = np.where(has_panel, totals[stub], 0)
             if value == bool:
-                in_prefix = 'judge_exp_'
-                out_prefix = 'panel_exp_'
-            elif value == float:
-                in_prefix = 'judge_ideo_'
-                out_prefix = 'panel_ideo_'
-            elif value == str:
-                in_prefix = 'judge_attr_'
-                out_prefix = 'panel_attr_'
-            elif value == int:
-                in_prefix = 'judge_demo_'
-                out_prefix = 'panel_demo_'
-            in_cols = [x for x in df if in_prefix + key in x]
-            df[out_prefix + key] = (np.where(
-                df['panel_size'] > 0,
-                df[in_cols].sum(axis = 'columns'), 0))
-        return df
\ No newline at end of file
+                panel_totals = panel_totals.astype(int)
+            panel_cols[stub.replace('judge_', 'panel_', 1)] = panel_totals
+        drop_prefixes = ['judge_demo_' + key for key in drop_keys]
+        df = df.drop(columns = [col for col in df
+                                if col in new_cols or col in panel_cols
+                                or col.startswith(tuple(drop_prefixes))])
+        return pd.concat([df, judge_df,
+                          pd.DataFrame(panel_cols, index = df.index)],
+                         axis = 'columns')
\ No newline at end of file
@@ -2,9 +2,13 @@
 from dataclasses import dataclass
 import os
 
+from more_itertools import unique_everseen
+import numpy as np
 from simplify import timer
 from simplify.almanac.steps import Deliver
 
+from ...implements import VOTE_DISSENT, panel_tensor
+
 
 @timer('Feature engineering')
 @dataclass
@@ -122,10 +126,9 @@ class CPDeliver(Deliver):
         stubs = self._judge_stubs()
         wide_drop_list = []
         if self.shape == 'long':
-            self.cases.reshape_long(stubs = stubs,
-                                    id_col = 'index_universal',
-                                    new_col = 'panel_position')
-            self.cases.drop_columns(columns = ['panel_position'])
+            panels = panel_tensor(self.cases.df, stubs,
+                                  mask_stub = 'judge_name')
+            self.cases.df = panels.to_long(df = self.cases.df)
             panel_cols = [c for c in self.cases.df if c.startswith('panel_')]
             panel_drop_cols = ['panel_judges_list', 'panel_size']
             panel_cols = [c for c in panel_cols if c not in panel_drop_cols]
@@ -141,11 +144,10 @@ class CPDeliver(Deliver):
             self.cases.df = (
                     self.cases.df[self.cases.df['judge_name'].str.len() > 1])
             if self.iso_votes:
+                dissent = (self.cases.df['judge_vote_code'] & VOTE_DISSENT) > 0
                 self.cases.df[self.label] = np.where(((
-                        self.cases.df['judge_vote_dissent']
-                        & self.cases.df[self.label])
-                        | (~self.cases.df['judge_vote_dissent']
-                        & ~ self.cases.df[self.label])),
+                        dissent & self.cases.df[self.label])
+                        | (~dissent & ~ self.cases.df[self.label])),
                         False, True)
         elif self.shape == 'wide':
             stubs.remove('judge_name')
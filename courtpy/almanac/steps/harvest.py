@@ -1,5 +1,6 @@
 
 from dataclasses import dataclass
+from multiprocessing import Pool
 import os
 import re
 
@@ -9,6 +10,37 @@ from simplify import timer
 from simplify.almanac.steps import Harvest
 from simplify.implements import listify
 
+from ...implements import BatchWriter, CaseArchive, HarvestManifest
+from ...implements import PatternSet, normalize_lexis
+
+
+# Attributes of the harvester which are used to read and parse a case. Only
+# these are sent to worker processes in parallel harvesting.
+_PARSER_ATTRIBUTES = ['archive', 'case_archive', 'cases',
+                      'concur_dissent_separator', 'concur_separator',
+                      'dissent_separator', 'encoding', 'mixed_separator',
+                      'normalize_cases', 'opinion_divider']
+
+# Harvester instance held by each worker process in parallel harvesting.
+_harvester = None
+
+
+def _initialize_worker(harvester_class, parser):
+    """Builds a harvester in a worker process from the parser attributes (and
+    the organizer and keyword search techniques) so that its compiled
+    patterns stay warm for every case the worker parses.
+    """
+    global _harvester
+    _harvester = object.__new__(harvester_class)
+    _harvester.__dict__.update(parser)
+    return
+
+
+def _harvest_worker(case):
+    index_number, source = case
+    return _harvester._harvest_case(index_number = index_number,
+                                    source = source)
+
 
 @timer('Initial case data collection (Harvesting)')
 @dataclass
@@ -23,12 +55,40 @@ class CPHarvest(Harvest):
     performed by CPHarvest. Other data is munged by the CPThresh in a vectorized
     manner. Because of the memory necessary to load all court opinions in large
     datasets, CPHarvest has to apply non-vectorized, case-by-case methods.
+
+    If parallel_harvest is True, cases are parsed by a pool of harvest_workers
+    processes (all available cores if 0) in chunks of harvest_chunksize cases.
+    Results are returned in case_num order so that the exported file is the
+    same as the serial output.
+
+    Parsed cases are written in batches of harvest_batch_rows rows (or
+    harvest_batch_bytes bytes, if not 0) to a harvest_format ('csv' or
+    'parquet') file.
+
+    If incremental_harvest is True and harvest_format is 'csv', a manifest of
+    harvested files is kept with the output. Only files which are new, were
+    modified, or were harvested with different instruction files are parsed
+    and their rows are merged into the existing output.
+
+    If case_archive is True, opinions are read in order from the CaseArchive
+    written by LexisSplit instead of from separate files. If normalize_cases
+    is True, the same normalization LexisSplit applies is applied to each
+    opinion before it is parsed.
     """
     technique : str = ''
     techniques : object = None
     parameters : object = None
     auto_prepare : bool = True
     name : str = 'harvester'
+    parallel_harvest : bool = False
+    harvest_workers : int = 0
+    harvest_chunksize : int = 20
+    harvest_batch_rows : int = 1000
+    harvest_batch_bytes : int = 0
+    harvest_format : str = 'csv'
+    incremental_harvest : bool = False
+    case_archive : bool = False
+    normalize_cases : bool = False
 
     def __post_init__(self):
         """The main input/output loop which takes data from source files and
@@ -40,9 +100,56 @@ class CPHarvest(Harvest):
         for self.source in listify(self.sources):
             self.organizer_file = self.source + '.csv'
             super().__post_init__()
+            self._set_keyword_search()
             self.start()
         return self
 
+    def _harvest_case(self, index_number, source):
+        """Reads and parses a single court opinion and returns its pandas
+        series.
+        """
+        case_text = self._read_case(source = source)
+        if self.normalize_cases:
+            case_text = normalize_lexis(case_text)
+        self.cases.create_series()
+        self._separate_header(case_text)
+        self._separate_concur_dissent()
+        self.cases.add_index(index_number = index_number)
+        self.cases.df, self.header = self.techniques['organizer'].match(
+                df = self.cases.df, source = self.header)
+        self.cases.df = self.techniques['keyword_search'].match(
+                df = self.cases.df, source = self.opinions)
+        return self.cases.df
+
+    def _harvest_cases(self, cases):
+        """Yields the parsed series for each (index_number, source) tuple in
+        cases.
+
+        In parallel harvesting, only the sources are sent to the workers,
+        which read the opinions themselves.
+        """
+        if self.parallel_harvest:
+            with Pool(processes = self.harvest_workers or None,
+                      initializer = _initialize_worker,
+                      initargs = (type(self), self._parser())) as pool:
+                for series in pool.imap(_harvest_worker, cases,
+                                        chunksize = self.harvest_chunksize):
+                    yield series
+        else:
+            for index_number, source in cases:
+                yield self._harvest_case(index_number = index_number,
+                                         source = source)
+
+    def _parser(self):
+        """Returns a dictionary of the attributes and techniques used to read
+        and parse a case.
+        """
+        parser = {name : getattr(self, name) for name in _PARSER_ATTRIBUTES}
+        parser['techniques'] = {
+                name : self.techniques[name]
+                for name in ['organizer', 'keyword_search']}
+        return parser
+
     def _prepare_concur_dissent(self):
         concur_dissent_df = pd.read_csv(self.separate_opinions_file,
                                         usecols = ['keys', 'values'])
@@ -55,6 +162,18 @@ class CPHarvest(Harvest):
                                    flags = [re.IGNORECASE|re.DOTALL]))
         return self
 
+    def _read_case(self, source):
+        """Returns the text of source, which is a file path or, if
+        case_archive is True, a (court_num, case_num) tuple in the archive.
+        """
+        if self.case_archive:
+            court_num, case_num = source
+            return self.archive.read(court_num = court_num,
+                                     case_num = case_num)
+        with open(source, mode = 'r', errors = 'ignore',
+                  encoding = self.encoding) as a_file:
+            return a_file.read()
+
     def _separate_concur_dissent(self):
         """Divides concurring, dissenting, and mixed opinions."""
         separate_list = []
@@ -94,6 +213,37 @@ class CPHarvest(Harvest):
             self.opinions_breaks = ''
         return self
 
+    def _set_keyword_search(self):
+        """Loads every keyword and opinion parser expression into a single
+        PatternSet so that each opinion is scanned in one call.
+        """
+        self.instruction_paths = [
+                os.path.join(self.inventory.instructions,
+                             'keywords_' + self.jurisdiction + '.csv'),
+                os.path.join(self.inventory.instructions,
+                             'parser_opinions_' + self.jurisdiction + '.csv')]
+        self.techniques['keyword_search'] = PatternSet(
+                file_paths = self.instruction_paths, encoding = self.encoding)
+        return self
+
+    def _set_manifest(self, output_path):
+        """Returns a HarvestManifest for output_path if incremental
+        harvesting is used. Otherwise, None is returned.
+        """
+        if (self.incremental_harvest and self.harvest_format == 'csv'
+                and not self.case_archive):
+            return HarvestManifest(
+                    file_path = os.path.join(self.inventory.interim,
+                                             'harvest_manifest.csv'),
+                    output_path = output_path,
+                    instruction_paths = (
+                            self.instruction_paths
+                            + [self.separate_opinions_file,
+                               os.path.join(self.inventory.organizers,
+                                            self.organizer_file)]),
+                    encoding = self.encoding)
+        return None
+
     def _set_defaults(self):
         self.opinion_divider = '\nOPINION(?=\n\n)'
         self.separate_opinions_file = os.path.join(self.inventory.organizers,
@@ -104,22 +254,41 @@ class CPHarvest(Harvest):
     def start(self, cases = None):
         if not cases:
             cases = self.cases
-        self.inventory.initialize_series_writer(
-                file_name = 'harvested_cases.csv',
-                column_list = cases.column_list)
-        cases.create_series()
-        for case_num, a_path in enumerate(self.inventory.globbed_paths):
-            with open(a_path, mode = 'r', errors = 'ignore',
-                      encoding = self.encoding) as a_file:
-                case_text = a_file.read()
-                self.separate_header(case_text)
-                self.separate_concur_dissent()
-                cases.add_index(index_number = case_num + 1)
-                cases.df, self.header = self.techniques['organizer'].match(
-                        df = cases.df, source = self.header)
-                cases.df = self.techniques['keyword_search'].match(
-                        df = cases.df, source = self.opinion)
-                self.inventory.save(variable = self.cases.df)
+        self.cases = cases
+        output_path = os.path.join(self.inventory.interim,
+                                   'harvested_cases.' + self.harvest_format)
+        manifest = self._set_manifest(output_path = output_path)
+        self.archive = None
+        if manifest:
+            cases_to_harvest = manifest.update(self.inventory.globbed_paths)
+            file_path = output_path + '.delta'
+        elif self.case_archive:
+            self.archive = CaseArchive(folder = self.inventory.lexis_cases,
+                                       encoding = self.encoding)
+            cases_to_harvest = enumerate(
+                    ((court_num, case_num)
+                     for case_num, court_num, *_ in self.archive.index),
+                    start = 1)
+            file_path = output_path
+        else:
+            cases_to_harvest = enumerate(self.inventory.globbed_paths,
+                                         start = 1)
+            file_path = output_path
+        writer = BatchWriter(
+                file_path = file_path,
+                column_list = cases.column_list,
+                file_format = self.harvest_format,
+                batch_rows = self.harvest_batch_rows,
+                batch_bytes = self.harvest_batch_bytes,
+                encoding = self.encoding)
+        try:
+            for case_num, series in enumerate(
+                    self._harvest_cases(cases = cases_to_harvest)):
+                writer.save(series = series)
                 if (case_num + 1) % 100 == 0 and self.verbose:
                     print(case_num + 1, 'cases parsed')
+        finally:
+            writer.close()
+        if manifest:
+            manifest.merge(delta_path = file_path)
         return self
\ No newline at end of file
@@ -11,6 +11,7 @@ from simplify.managers import Technique
 from simplify.almanac.steps import Sow
 
 
+from ...implements import CaseArchive, normalize_characters, normalize_lexis
 from .combiners.biographies import Biographies
 from .combiners.executive import Executive
 from .combiners.judiciary import Judiciary
@@ -68,21 +69,37 @@ class LexisSplit(Technique):
     option is included if the user wants the individual case files to be stored
     in separate subdirectories based upon which court the opinion was issued
     in.
+
+    Batch files are read in blocks of chunk_size characters, which are cut
+    before the last complete line that _clean_file can neither remove nor
+    change the start of. Because nothing removed by _clean_file and no
+    document boundary crosses such a line, each block is cleaned and split on
+    its own and each case is exported as soon as its end is found. Peak
+    memory is about one opinion and one block rather than a whole batch
+    file.
+
+    If the case_archive option is selected, opinions are appended to a
+    CaseArchive in the lexis_cases folder instead of separate .txt files.
+    Like the .txt files, an existing archive is replaced when the files are
+    split again.
     """
     paths : object = None
     settings : object = None
     source : str = 'lexis'
     stage : str = 'prepper'
+    chunk_size : int = 1048576
     prep_message = 'Lexis-Nexis cases split into individual text files'
 
     def __post_init__(self):
         self.settings.localize(instance = self,
                                sections = ['files', 'general', 'cases',
-                                           'prepper', 'wrangler'])
+                                           'almanac', 'prepper', 'wrangler'])
         self.source_files = {'federal' : 'federal_court_nums.csv'}
         self.prepped_files = {'federal' : 'federal_court_nums.csv'}
         self.prepper_options = {}
         self._dicts = {}
+        self.document_divider = re.compile(r'\d* of \d* DOCUMENTS')
+        self.removed_line = re.compile(r'Signal:|SIGNAL:|As of:|AS OF:')
         return self
 
     def _check_folder(self, folder_name):
@@ -90,41 +107,75 @@ class LexisSplit(Technique):
             os.makedirs(folder_name)
         return self
 
-#    def _cases_export(self, case_list, case_num):
-#        """Exports text files into the proper folders."""
-#        court_num = 0
-#        for i, case in enumerate(case_list):
-#            if len(case.strip()) > 0:
-#                if re.search(self.divider, case):
-#                    court_sec = re.search(self.divider, case)
-#                    court_num = match_iter(court_sec.upper, court_nums)
-#                else:
-#                    court_num = 999
-#                subfolder = subfolders.get(court_num)
-#                file_name = str(court_num * 10000000 + tot_index) + '.txt'
-#                if settings.make_subfolders:
-#                    path_name = os.path.join(paths.lexis_cases, subfolder,
-#                                             file_name)
-#                else:
-#                    path_name = os.path.join(paths.lexis_cases, file_name)
-#                f = open(path_name, 'w')
-#                f.write(case.strip())
-#                f.close()
-#                tot_index += 1
-#        return tot_index
+    def _export_case(self, case):
+        """Exports a single case text file into the proper folder (or the
+        archive).
+        """
+        if len(case.strip()) > 0:
+            court_sec = re.search(self.divider, case)
+            if court_sec:
+                court_num = self._match_court(court_sec.group(0).upper())
+            else:
+                court_num = 999
+            case_num = court_num * 10000000 + self.tot_index
+            if self.case_archive:
+                self.archive.append(case_num = case_num,
+                                    court_num = court_num,
+                                    text = case.strip())
+            else:
+                if self.make_subfolders:
+                    folder = os.path.join(
+                            self.paths.lexis_cases,
+                            self.subfolders.get(court_num, 'other'))
+                    self._check_folder(folder)
+                else:
+                    folder = self.paths.lexis_cases
+                file_path = os.path.join(folder, str(case_num) + '.txt')
+                with open(file_path, mode = 'w', encoding = self.encoding,
+                          errors = 'ignore') as a_file:
+                    a_file.write(case.strip())
+            self.tot_index += 1
+        return self
 
     def _clean_file(self, text):
         """Removes common anomalies in Lexis-Nexis court opinions."""
-        text = text.replace('*', '')
-        text = re.sub(r'\[\d*\]', '', text)
-        text = re.sub(r'[^\S\n]', ' ', text)
-        text = self.no_double_space(text)
-        text = re.sub(r'(?m)^Signal:.*\n?\n?', '', text)
-        text = re.sub(r'(?m)^SIGNAL:.*\n?\n?', '', text)
-        text = re.sub(r'(?m)^As of:.*\n?\n?', '', text)
-        text = re.sub(r'(?m)^AS OF:.*\n?\n?', '', text)
-        text = re.sub(r'\n ', '\n', text)
-        return text
+        return normalize_lexis(text)
+
+    def _blocks(self, a_file):
+        """Yields blocks of a_file which end at a line break followed by a
+        non-whitespace character (or at the end of a_file).
+        """
+        pending = ''
+        for chunk in iter(lambda: a_file.read(self.chunk_size), ''):
+            pending += chunk
+            cut = self._last_cut(pending)
+            if cut:
+                yield pending[:cut]
+                pending = pending[cut:]
+        if pending:
+            yield pending
+
+    def _is_boundary(self, line):
+        """Returns whether line is kept by _clean_file and starts with a
+        character that _clean_file leaves in place.
+        """
+        line = normalize_characters(line)
+        return (len(line) > 0 and not line[0].isspace()
+                and not self.removed_line.match(line))
+
+    def _last_cut(self, text):
+        """Returns the index of the start of the last complete line in text
+        which is a boundary, or 0 if there is none.
+        """
+        end = text.rfind('\n')
+        while end > 0:
+            cut = text.rfind('\n', 0, end)
+            if cut < 0:
+                return 0
+            if self._is_boundary(text[cut + 1:end]):
+                return cut + 1
+            end = cut
+        return 0
 
     def _create_court_dicts(self):
         divider_file =  os.path.join(self.paths.dividers,
@@ -141,6 +192,13 @@ class LexisSplit(Technique):
         self.court_nums = _df.set_index('keys').to_dict()['values']
         return self
 
+    def _match_court(self, court_text):
+        """Returns the court number for the court named in court_text."""
+        for key, value in self.court_nums.items():
+            if re.search(key, court_text, flags = re.IGNORECASE):
+                return value
+        return 999
+
     def _munge_meta(self, df, bundle):
         df[self.section_prefix + 'file_name'] = (
                 os.path.split(bundle['a_path'])[1])
@@ -174,11 +232,27 @@ class LexisSplit(Technique):
         folders based upon the court in the self.subfolders dictionary of
         court numbers and names.
         """
-        for i, each_path in enumerate(self.paths.import_paths):
+        self.tot_index = 0
+        if self.case_archive:
+            self.archive = CaseArchive(folder = self.paths.lexis_cases,
+                                       encoding = self.encoding)
+            self.archive.clear()
+        for each_path in self.paths.import_paths:
             with open(each_path, mode = 'r', errors = 'ignore',
                       encoding = self.encoding) as a_file:
-                batch_cases = a_file.read()
-                batch_cases = self._clean_file(batch_cases)
-                case_list = re.split('\d* of \d* DOCUMENTS', batch_cases)
-                self._cases_export(case_list, i)
-        return
\ No newline at end of file
+                self._split_file(a_file)
+        if self.case_archive:
+            self.archive.close()
+        return self
+
+    def _split_file(self, a_file):
+        """Cleans and exports each case in a_file, one block at a time."""
+        case = []
+        for block in self._blocks(a_file):
+            case_list = self.document_divider.split(self._clean_file(block))
+            case.append(case_list[0])
+            for next_case in case_list[1:]:
+                self._export_case(''.join(case))
+                case = [next_case]
+        self._export_case(''.join(case))
+        return self
\ No newline at end of file
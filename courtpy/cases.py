@@ -6,6 +6,8 @@ import os
 
 from simplify import Ingredients
 
+from .implements import ColumnBatch
+
 #from .combiners import (Biographies, Executive, Judges, Judiciary,
 #                        Legislature)
 
@@ -35,6 +37,10 @@ class Cases(Ingredients):
         columns_dict: dictionary containing column names and datatypes for df
             or x (if data has been split) dataframes or series
         source_format: what database the court opinion data is from.
+        memory_peaks: dictionary of the peak memory (in bytes) used by each
+            column batch which tracks memory, keyed by the name of the batch.
+        batch_times: dictionary of the time (in seconds) used by each column
+            batch, keyed by the name of the batch.
     """
     df : object = None
     menu : object = None
@@ -54,6 +60,8 @@ class Cases(Ingredients):
 
     def __post_init__(self):
         super().__post_init__()
+        self.memory_peaks = {}
+        self.batch_times = {}
         return
 
     def _create_analyzer_rules(self):
@@ -258,7 +266,7 @@ class Cases(Ingredients):
                               'panel_ideo' : 'judge_name',
                               'panel_size' : 'sec_panel_judges',
                               'politics' : 'year'}
-        df[out_column] = df[match_column].astype(str).map(map_dict)
+        df[out_column] = df[match_column].map(map_dict)
         return df
 
     def _check_df(func):
@@ -325,7 +333,7 @@ class Cases(Ingredients):
                                  'judge_demo' : float,
                                  'judge_ideo' : float,
                                  'panel_size' : int,
-                                 'judge_vote' : bool,
+                                 'judge_vote' : int,
                                  'agency' : 'category',
                                  'type' : bool,
                                  'politics' : float,
@@ -387,6 +395,20 @@ class Cases(Ingredients):
     def add_munger(self, munger_name, source_section):
         return self.mungers.sources.update({munger_name, source_section})
 
+    def column_batch(self, df = None, name = '', verbose = False,
+                     track_memory = False):
+        """Returns a ColumnBatch for staging new columns of df. Use it as a
+        context manager: the columns are added when the with block ends and
+        the time of the block is stored in batch_times under name. If
+        track_memory is True, the peak memory of the block is stored in
+        memory_peaks as well.
+        """
+        if df is None:
+            df = getattr(self, self.default_df)
+        return ColumnBatch(df = df, name = name, peaks = self.memory_peaks,
+                           verbose = verbose, track_memory = track_memory,
+                           times = self.batch_times)
+
     def munge(self, df = None, bundle = None):
         if self.step in ['wrangler']:
             df['court_num'].fillna(method = 'ffill', inplace = True,
@@ -1,39 +1,224 @@
-
 from dataclasses import dataclass
 
+import numpy as np
 import pandas as pd
 
 from .entity import Entity
 
 
+def _year(date, default):
+    if date is None:
+        return default
+    return getattr(date, 'year', date)
+
+
+def _store_values(store, name):
+    """Returns the values of field name for the members of store (an
+    EntityStore), with categories decoded and None for missing categories.
+    """
+    if name in store.categories:
+        categories = np.append(
+                store.categories[name].to_numpy(dtype = object), None)
+        codes = store.fields[name]
+        return categories[np.where(codes < 0, len(categories) - 1, codes)]
+    return store.fields[name]
+
+
+def _store_years(store, name, missing, default = None):
+    """Returns the years of field name for the members of store as floats,
+    as _year reads them from each member with missing as its default.
+    """
+    if name not in store.fields:
+        value = getattr(store.default, name, default)
+        years = missing if value is None else float(_year(value, np.nan))
+        return np.broadcast_to(years, (len(store),)).astype(float)
+    values = _store_values(store, name)
+    if values.dtype.kind == 'M':
+        years = pd.DatetimeIndex(values).year.to_numpy(dtype = float)
+        return np.where(np.isnat(values), missing, years)
+    elif values.dtype.kind in 'biuf':
+        return values.astype(float)
+    missing = np.broadcast_to(missing, (len(store),))
+    return np.array([fill if value is None else float(_year(value, fill))
+                     for value, fill in zip(values, missing)],
+                    dtype = float)
+
+
+def _store_sums(store, name):
+    """Returns the values of field name that the members of store add to a
+    'sum' column, with 0 for None.
+    """
+    if name not in store.fields:
+        value = getattr(store.default, name, None)
+        return np.full(len(store), 0.0 if value is None else float(value))
+    values = _store_values(store, name)
+    if values.dtype.kind in 'biuf':
+        return values.astype(float)
+    return np.array([0.0 if value is None else float(value)
+                     for value in values], dtype = float)
+
+
+def _store_flags(store, name):
+    """Returns whether field name is true for the members of store, which
+    is what they add to a 'count' column.
+    """
+    if name not in store.fields:
+        return np.full(len(store), bool(getattr(store.default, name, False)))
+    values = _store_values(store, name)
+    if values.dtype.kind == 'M':
+        return ~np.isnat(values)
+    elif values.dtype.kind in 'biuf':
+        return values != 0
+    return np.array([bool(value) for value in values], dtype = bool)
+
+
 @dataclass
 class Aggregator(Entity):
+    """Adds a table of yearly totals of the entity's members (such as the
+    judges and judgments of a court).
+
+    Each entry in table_columns is [method, attribute] or [method, attribute,
+    field], where method is 'sum' or 'count' and attribute is the name of a
+    dictionary of members. A member counts for every year from its
+    start_year up to its end_year (or, for members with a year, that year). If
+    field is in the member's table_columns as a 'bool_date' entry, the
+    member only counts from the first of those dates (if it is set) up to the
+    second.
+    """
 
     def __post_init__(self):
         pass
         return self
 
-    def _count(self, variable):
-        return len(variable)
-
-    def _sum(self, variable):
-        return sum(variable)
-
-    def create_time_table(self, columns_dict):
-        self.time_table = pd.DataFrame(columns = self.table_columns.keys(),
-                                       index = range(self.start_year,
-                                                     self._end_year),
-                                       dtype = int)
-        for year in range(self.start_year, self.end_year):
-            year_value = 0
-            for key, value in columns_dict.items():
-                _method = getattr(self, '_' + value[0])
-                _attribute = getattr(self, value[1])
-                for class_key, class_value in _attribute.items():
-                    if len(value) > 2:
-                        year_value += _method(getattr(class_value,
-                                                      value[2]).values())
-                    else:
-                        year_value += _method(getattr(_attribute).values())
-                self.time_table[year, key] = year_value
+    def _contribution(self, member, spec):
+        """Returns the first year, last year, and value that member adds to
+        a time table column described by spec.
+        """
+        if hasattr(member, 'year'):
+            first = last = member.year
+        else:
+            first = getattr(member, 'start_year', self.start_year)
+            last = getattr(member, 'end_year', self.end_year) - 1
+        value = 1.0
+        if len(spec) > 2:
+            member_spec = getattr(member, 'table_columns', {}).get(spec[2])
+            if member_spec and member_spec[0] == 'bool_date':
+                first = max(first,
+                            _year(getattr(member, member_spec[1]), last + 1))
+                last = min(last,
+                           _year(getattr(member, member_spec[2]), last + 1)
+                           - 1)
+            elif spec[0] == 'count':
+                value = float(bool(getattr(member, spec[2], False)))
+            else:
+                value = getattr(member, spec[2], None)
+                value = 0.0 if value is None else float(value)
+        return first, last, value
+
+    def _store_contributions(self, store, spec):
+        """Returns arrays of the first years, last years, and values that the
+        members of store (an EntityStore) add to a time table column
+        described by spec. They are the same as _contribution for each
+        member, but are read from the field arrays of the store at once.
+        """
+        store.compact()
+        if 'year' in store.fields or hasattr(store.default, 'year'):
+            first = _store_years(store, 'year', np.nan)
+            last = first.copy()
+        else:
+            first = _store_years(store, 'start_year', np.nan,
+                                 default = self.start_year)
+            last = _store_years(store, 'end_year', np.nan,
+                                default = self.end_year) - 1
+        value = np.ones(len(store))
+        if len(spec) > 2:
+            member_spec = getattr(store.default, 'table_columns', {}).get(
+                    spec[2])
+            if member_spec and member_spec[0] == 'bool_date':
+                start = _store_years(store, member_spec[1], last + 1)
+                end = _store_years(store, member_spec[2], last + 1)
+                first = np.where(np.isnan(start), first,
+                                 np.maximum(first, start))
+                last = np.where(np.isnan(end), last,
+                                np.minimum(last, end - 1))
+            elif spec[0] == 'count':
+                value = _store_flags(store, spec[2]).astype(float)
+            else:
+                value = _store_sums(store, spec[2])
+        return first, last, value
+
+    def _year_slice(self, first, last):
+        if np.isnan(first) or np.isnan(last):
+            return 0, 0
+        lower = max(int(first) - self.start_year, 0)
+        upper = min(int(last) - self.start_year + 1, len(self.time_table))
+        return lower, upper
+
+    def create_time_table(self, columns_dict = None):
+        """Builds time_table, which has a row for each year from start_year
+        up to end_year and a column for each entry in columns_dict (or
+        table_columns).
+
+        The members of each attribute are collected into arrays of first
+        years, last years, and values, which are added to a difference array
+        at once and summed over the years. If the attribute is an
+        EntityStore, the arrays are read from its fields instead of from each
+        member.
+        """
+        from .store import EntityStore
+        if columns_dict is None:
+            columns_dict = self.table_columns
+        self.time_columns = columns_dict
+        years = max(self.end_year - self.start_year, 0)
+        table = np.zeros((years + 1, len(columns_dict)))
+        for i, spec in enumerate(columns_dict.values()):
+            members = getattr(self, spec[1], None)
+            if isinstance(members, EntityStore):
+                first, last, value = self._store_contributions(members, spec)
+            else:
+                snapshot = np.array([self._contribution(member, spec)
+                                     for member in (members or {}).values()],
+                                    dtype = float).reshape(-1, 3)
+                first, last, value = snapshot.T
+            first = np.maximum(first - self.start_year, 0)
+            last = np.minimum(last - self.start_year, years - 1)
+            counted = first <= last
+            np.add.at(table[:, i], first[counted].astype(int),
+                      value[counted])
+            np.add.at(table[:, i], last[counted].astype(int) + 1,
+                      -value[counted])
+        self.time_table = pd.DataFrame(
+                np.cumsum(table, axis = 0)[:years],
+                index = range(self.start_year, self.start_year + years),
+                columns = list(columns_dict))
+        return self
+
+    def time_values(self, column, years):
+        """Returns an array of the values of column in time_table for each
+        year in years. Years outside of the table are NaN.
+        """
+        if getattr(self, 'time_table', None) is None:
+            self.create_time_table()
+        positions = np.asarray(years, dtype = np.int64) - self.start_year
+        size = len(self.time_table)
+        values = np.append(self.time_table[column].to_numpy(dtype = float),
+                           np.nan)
+        return values[np.where((positions >= 0) & (positions < size),
+                               positions, size)]
+
+    def update_time_table(self, member, attribute, remove = False):
+        """Adds member's values to (or, if remove is True, removes them from)
+        the years they affect in the time_table columns for attribute. Does
+        nothing if time_table has not been built.
+        """
+        if getattr(self, 'time_table', None) is None:
+            return self
+        for i, spec in enumerate(self.time_columns.values()):
+            if spec[1] == attribute:
+                first, last, value = self._contribution(member, spec)
+                lower, upper = self._year_slice(first, last)
+                if lower < upper:
+                    if remove:
+                        value = -value
+                    self.time_table.iloc[lower:upper, i] += value
         return self
\ No newline at end of file
@@ -22,8 +22,8 @@ class Court(Aggregator, Entity):
 
     def __post_init__(self):
         self.table_columns = {
-                'ideology_party' : ['sum', 'judges', 'party'],
-                'ideology_special' : ['sum', 'judges', 'ideology'],
+                'ideology_party' : ['sum', 'judges', 'ideology_party'],
+                'ideology_special' : ['sum', 'judges', 'ideology_special'],
                 'num_judges' : ['count', 'judges'],
                 'num_active_judges' : ['count', 'judges', 'active'],
                 'num_senior_judges' : ['count', 'judges', 'senior'],
@@ -32,43 +32,59 @@ class Court(Aggregator, Entity):
                 'num_reversals' : ['count', 'judgments', 'reversal']}
         return self
 
-    @property
     def ideology_party(self, year):
-        if not self.time_table:
-            self._create_time_table()
-        return self.ideology_party_year[year, 'ideology_party']
+        if self.time_table is None:
+            self.create_time_table()
+        return self.time_table.at[year, 'ideology_party']
 
-    @property
     def ideology_special(self, year):
-        if not self.time_table:
-            self._create_time_table()
-        return self.ideology_party_year[year, 'ideology_special']
+        if self.time_table is None:
+            self.create_time_table()
+        return self.time_table.at[year, 'ideology_special']
 
     def add_higher_court(self, higher_court):
-        self.higher_courts = self._check_dict(self.higher_courts)
+        self.higher_courts = self._check_dict('higher_courts')
         self.higher_courts.update({higher_court.name: higher_court})
         return self
 
     def add_geography(self, geographic_unit):
-        self.geography = self._check_dict(self.geography)
+        self.geography = self._check_dict('geography')
         self.geography.update({geographic_unit.name: geographic_unit})
         return self
 
     def add_judge(self, judge):
-        self.judges = self._check_dict(self.judges)
+        self.judges = self._check_dict('judges')
+        if judge.name in self.judges:
+            self.update_time_table(self.judges[judge.name], 'judges',
+                                   remove = True)
         self.judges.update({judge.name: judge})
+        self.update_time_table(judge, 'judges')
         return self
 
     def add_judgment(self, judgment):
-        self.judgments = self._check_dict(self.judgments)
+        self.judgments = self._check_dict('judgments')
+        if judgment.number in self.judgments:
+            self.update_time_table(self.judgments[judgment.number],
+                                   'judgments', remove = True)
         self.judgments.update({judgment.number : judgment})
+        self.update_time_table(judgment, 'judgments')
         return self
 
     def add_lower_court(self, lower_court):
-        self.lower_courts = self._check_dict(self.lower_courts)
+        self.lower_courts = self._check_dict('lower_courts')
         self.lower_courts.update({lower_court.name: lower_court})
         return self
 
+    def set_judges(self, judges):
+        self.judges = judges
+        self.time_table = None
+        return self
+
+    def set_judgments(self, judgments):
+        self.judgments = judgments
+        self.time_table = None
+        return self
+
     def set_jurisdiction(self, jurisdiction):
         self.jurisdiciton = jurisdiction
         return self
@@ -12,25 +12,25 @@ class Entity(object):
         return self
 
     def _check_df(self, attribute):
-        if hasattr(self, attribute):
+        if getattr(self, attribute, None) is not None:
             return getattr(self, attribute)
         else:
             return pd.DataFrame
 
     def _check_dict(self, attribute):
-        if hasattr(self, attribute):
+        if getattr(self, attribute, None) is not None:
             return getattr(self, attribute)
         else:
             return {}
 
     def _check_list(self, attribute):
-        if hasattr(self, attribute):
+        if getattr(self, attribute, None) is not None:
             return getattr(self, attribute)
         else:
             return []
 
     def _check_series(self, attribute):
-        if hasattr(self, attribute):
+        if getattr(self, attribute, None) is not None:
             return getattr(self, attribute)
         else:
             return pd.Series
@@ -35,15 +35,21 @@ class Judge(Aggregator, Entity):
         return self
 
     @property
-    def ideology_behavior(self, year):
+    def ideology_behavior(self):
+        if self.behavior is None:
+            return None
         return self.behavior.ideology
 
     @property
-    def ideology_party(self, year):
+    def ideology_party(self):
+        if self.appointment is None:
+            return None
         return self.appointment.executive_party
 
     @property
-    def ideology_special(self, year):
+    def ideology_special(self):
+        if self.appointment is None:
+            return None
         return self.appointment.special_ideology
 
 
@@ -8,6 +8,7 @@ from .entity import Entity
 class Judgment(Entity):
 
     number : int = 0
+    year : int = 0
     sections : object = None
     parties : object = None
     court : object = None
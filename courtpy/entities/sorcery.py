@@ -1,49 +1,363 @@
 
-import dataclasses as dataclass
+from collections import OrderedDict
+from dataclasses import dataclass
+import os
+import time
 
 import pandas as pd
 import sqlalchemy as db
 from sqlalchemy import (Table, Boolean, Column, Date, Integer, Numeric, String,
-                        MetaData, ForeignKey)
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, backref
-from sqlalchemy.orm import sessionmaker
+                        MetaData, ForeignKey, Index)
+from sqlalchemy.orm import declarative_base, relationship, backref
+from sqlalchemy.orm import scoped_session, sessionmaker
 
 from .entity import Entity
 
 Base = declarative_base()
-engine = db.create_engine('sqlite:///court_database.db', echo = True)
-Session = sessionmaker(bind = engine)
-session = Session()
 
-Base.metadata.create_all(engine)
+# Database settings used when the engine is first created. They are changed
+# with configure (or the 'database' section of a menu passed to Sorcery).
+# Pool settings which are None are left to SQLAlchemy.
+DATABASE = {'url' : 'sqlite:///court_database.db',
+            'echo' : False,
+            'pool_size' : None,
+            'max_overflow' : None,
+            'pool_recycle' : None}
+
+# Results of Sorcery queries for each database, statement, and set of
+# parameters, most recently used last. Any write through Sorcery (or change
+# of settings with configure) clears it.
+_results = OrderedDict()
+
+# Query statements for each combination of filters.
+_statements = {}
+
+# Engines for each process id, so that worker processes never share a pool
+# created by their parent.
+_engines = {}
+
+# Sessions for each thread, bound to the engine on first use.
+Session = scoped_session(sessionmaker())
+
+
+def configure(menu = None, **kwargs):
+    """Changes the database settings to those in the 'database' section of
+    menu (if passed) and kwargs. Engines created with the old settings are
+    closed, so the next use creates one with the new settings.
+    """
+    settings = {}
+    if menu is not None:
+        try:
+            settings.update(menu['database'])
+        except KeyError:
+            pass
+    settings.update(kwargs)
+    for name, value in settings.items():
+        if name == 'echo':
+            value = str(value).lower() in ['true', '1', 'debug']
+        elif name in ['pool_size', 'max_overflow', 'pool_recycle']:
+            value = None if value in [None, '', 'None'] else int(value)
+        DATABASE[name] = value
+    Session.remove()
+    for engine in _engines.values():
+        engine.dispose()
+    _engines.clear()
+    _results.clear()
+    return DATABASE
+
+
+def get_engine():
+    """Returns the engine for this process, creating it (and any missing
+    tables) on first use.
+    """
+    pid = os.getpid()
+    if pid not in _engines:
+        _engines.clear()
+        options = {name : DATABASE[name]
+                   for name in ['pool_size', 'max_overflow', 'pool_recycle']
+                   if DATABASE[name] is not None}
+        engine = db.create_engine(DATABASE['url'], echo = DATABASE['echo'],
+                                  **options)
+        Base.metadata.create_all(engine)
+        Session.remove()
+        Session.configure(bind = engine)
+        _engines[pid] = engine
+    return _engines[pid]
+
+
+def get_session():
+    """Returns the session for this thread."""
+    get_engine()
+    return Session()
+
+
+# SQLite settings which speed up bulk loads, for use as Sorcery's pragmas.
+SQLITE_PRAGMAS = {'journal_mode' : 'WAL',
+                  'synchronous' : 'NORMAL',
+                  'cache_size' : -200000,
+                  'temp_store' : 'MEMORY'}
+
 
 @dataclass
 class Sorcery(Entity):
+    """Loads and reads CourtPy entities in an SQL database.
+
+    Bulk loads stream a dataframe into a table in chunks of chunk_rows rows,
+    each inserted with a single executemany. Every chunks_per_commit chunks
+    share a transaction. The indexes of the table are dropped during a load
+    and created again at the end. For SQLite databases, pragmas (such as the
+    journal mode, synchronous setting, and cache size) may be set on the
+    connection used for the load and are restored afterwards. The rows per
+    second of each load are stored in load_rates.
+
+    Slices of judgments by judge, court, and years are read with statements
+    which are built once for each combination of filters and take their
+    values as bound parameters. Results are returned as dataframes (or
+    chunks of chunk_rows rows) and the most recent cache_size results are
+    cached until the next write.
+
+    The engine is created the first time the database is used, with the
+    settings in DATABASE. If menu is passed, its 'database' section changes
+    those settings.
+
+    Attributes:
+        menu: an instance of Menu with an optional 'database' section.
+        chunk_rows: number of rows inserted with each executemany.
+        chunks_per_commit: number of chunks in each transaction.
+        pragmas: dictionary of SQLite pragmas and values for bulk loads
+            (such as SQLITE_PRAGMAS). If it is None, the database settings
+            are not changed.
+        verbose: whether to print the rows per second of each load.
+        cache_size: number of query results kept in the cache.
+    """
+    menu : object = None
+    chunk_rows : int = 50000
+    chunks_per_commit : int = 20
+    pragmas : object = None
+    verbose : bool = False
+    cache_size : int = 128
 
     def __post_init__(self):
-        self.connection = engine.connect()
-        self.metadata = db.MetaData()
+        if self.menu is not None:
+            configure(menu = self.menu)
+        self._connection = None
+        self.metadata = Base.metadata
+        self.load_rates = {}
         return self
 
+    @property
+    def connection(self):
+        """Returns a connection to the database, opened on first use."""
+        if self._connection is None or self._connection.closed:
+            self._connection = get_engine().connect()
+        return self._connection
+
+    def _apply_pragmas(self, connection, pragmas):
+        """Sets pragmas on the driver connection so that they are run
+        outside of any transaction and returns their previous values.
+        """
+        previous = {}
+        if connection.engine.dialect.name == 'sqlite' and pragmas:
+            cursor = connection.connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute('PRAGMA ' + name)
+                previous[name] = cursor.fetchone()[0]
+                cursor.execute('PRAGMA ' + name + ' = ' + str(value))
+                cursor.fetchall()
+            cursor.close()
+        return previous
+
+    def _chunks(self, statement, params, chunk_rows):
+        with get_engine().connect() as connection:
+            result = connection.execute(statement, params)
+            columns = list(result.keys())
+            rows = result.fetchmany(chunk_rows)
+            while rows:
+                yield pd.DataFrame.from_records(rows, columns = columns)
+                rows = result.fetchmany(chunk_rows)
+
+    def _get_table(self, table):
+        if isinstance(table, str):
+            return self.metadata.tables[table]
+        return getattr(table, '__table__', table)
+
+    def _records(self, df):
+        """Returns the rows of df as a list of dictionaries with None for
+        missing values.
+        """
+        df = df.astype(object)
+        return df.where(df.notna(), None).to_dict('records')
+
     def add_records(self, table_name, records):
-        query = db.insert(table_name)
-        records = self._listify(records)
-        sql_set = self.connection.execute(query, self._listify(records))
+        """Inserts records (a dictionary or list of dictionaries) into
+        table_name in one transaction.
+        """
+        if isinstance(records, dict):
+            records = [records]
+        if records:
+            _results.clear()
+            with self.connection.begin():
+                self.connection.execute(
+                        self._get_table(table_name).insert(), records)
         return self
 
+    def bulk_load(self, table_name, df):
+        """Inserts the rows of df into table_name (a table name, table, or
+        mapped class) and returns the number of rows per second.
+
+        Only columns of df which are in the table are inserted. The indexes
+        of the table and the database settings are restored even if the load
+        fails.
+        """
+        table = self._get_table(table_name)
+        columns = [col for col in df.columns if col in table.columns]
+        insert = table.insert()
+        _results.clear()
+        started = time.perf_counter()
+        with get_engine().connect() as connection:
+            previous = self._apply_pragmas(connection, self.pragmas)
+            try:
+                self.metadata.create_all(connection, tables = [table])
+                for index in table.indexes:
+                    connection.execute(db.text(
+                            'DROP INDEX IF EXISTS ' + index.name))
+                step = self.chunk_rows * self.chunks_per_commit
+                for start in range(0, len(df), step):
+                    with connection.begin():
+                        for chunk_start in range(start,
+                                                 min(start + step, len(df)),
+                                                 self.chunk_rows):
+                            chunk = df[columns].iloc[
+                                    chunk_start:chunk_start + self.chunk_rows]
+                            connection.execute(insert, self._records(chunk))
+            finally:
+                with connection.begin():
+                    for index in table.indexes:
+                        connection.execute(db.text(
+                                'DROP INDEX IF EXISTS ' + index.name))
+                        index.create(connection)
+                self._apply_pragmas(connection, previous)
+        seconds = time.perf_counter() - started
+        self.load_rates[table.name] = len(df) / max(seconds, 1e-9)
+        if self.verbose:
+            print(len(df), 'rows loaded into', table.name, 'at',
+                  int(self.load_rates[table.name]), 'rows per second')
+        return self.load_rates[table.name]
+
+    def bulk_load_panels(self, df, judge_stub = 'judge_name',
+                         number_col = 'number', year_col = 'year'):
+        """Loads the judges on each panel in df (in the columns named
+        judge_stub followed by a panel position) into judgment_judges and
+        returns the number of rows per second.
+        """
+        stubs = [col for col in df.columns
+                 if str(col).startswith(judge_stub)
+                 and str(col)[len(judge_stub):].isdigit()]
+        panels = (df.melt(id_vars = [number_col, year_col],
+                          value_vars = stubs, value_name = 'judge')
+                    .dropna(subset = ['judge'])
+                    .drop_duplicates(subset = [number_col, 'judge'])
+                    .rename(columns = {number_col : 'judgment',
+                                       year_col : 'year'}))
+        return self.bulk_load('judgment_judges', panels)
+
     def close_sql(self):
-        self.connection.close()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
 
     def convert_to_df(self, sql_table):
         df = pd.DataFrame(sql_table)
         df.columns = sql_table.keys()
         return df
 
+    def judgments(self, judge = None, court = None, start_year = None,
+                  end_year = None, chunk_rows = None):
+        """Returns a dataframe of the judgments of judge (on the panel) in
+        court from start_year through end_year. Filters which are None are
+        not used. If chunk_rows is passed, an iterator of dataframes with up
+        to chunk_rows rows is returned instead.
+        """
+        params = {'judge' : judge, 'court' : court,
+                  'start_year' : start_year, 'end_year' : end_year}
+        params = {name : value for name, value in params.items()
+                  if value is not None}
+        key = ('judgments',) + tuple(sorted(params))
+        if key not in _statements:
+            _statements[key] = judgments_statement(*key[1:])
+        return self.query(_statements[key], params, chunk_rows = chunk_rows,
+                          key = key)
+
+    def query(self, statement, params = None, chunk_rows = None,
+              key = None):
+        """Returns a dataframe of the results of statement (an SQLAlchemy
+        statement with bound parameters) for params.
+
+        If chunk_rows is passed, an iterator of dataframes with up to
+        chunk_rows rows is returned instead. Otherwise, results are cached
+        under key (or the text of statement) and params.
+        """
+        params = params or {}
+        if chunk_rows:
+            return self._chunks(statement, params, chunk_rows)
+        if key is None:
+            key = str(statement)
+        cache_key = (DATABASE['url'], key, tuple(sorted(params.items())))
+        if cache_key in _results:
+            _results.move_to_end(cache_key)
+        else:
+            with get_engine().connect() as connection:
+                result = connection.execute(statement, params)
+                _results[cache_key] = pd.DataFrame.from_records(
+                        result.fetchall(), columns = list(result.keys()))
+            while len(_results) > self.cache_size:
+                _results.popitem(last = False)
+        return _results[cache_key].copy()
+
     def create_table(self):
 
         return self
 
+def judgments_statement(*filters):
+    """Returns a select of judgments with a bound parameter for each name in
+    filters ('judge', 'court', 'start_year', and 'end_year').
+
+    A judge filter joins judgment_judges so that its (judge, year) index
+    finds the judgments. Other filters use the (court, year) index of
+    judgments.
+    """
+    judgments = Judgment.__table__
+    panels = judgment_judges
+    statement = judgments.select()
+    if 'judge' in filters:
+        statement = statement.select_from(judgments.join(
+                panels, panels.c.judgment == judgments.c.number))
+        statement = statement.where(panels.c.judge == db.bindparam('judge'))
+        year = panels.c.year
+    else:
+        year = judgments.c.year
+    if 'court' in filters:
+        statement = statement.where(
+                judgments.c.court == db.bindparam('court'))
+    if 'start_year' in filters:
+        statement = statement.where(year >= db.bindparam('start_year'))
+    if 'end_year' in filters:
+        statement = statement.where(year <= db.bindparam('end_year'))
+    return statement.order_by(judgments.c.year, judgments.c.number)
+
+
+# Judges on the panel of each judgment. The year of the judgment is copied
+# so that slices of a judge's judgments by year use the (judge, year) index.
+judgment_judges = Table('judgment_judges', Base.metadata,
+                        Column('judgment', Integer,
+                               ForeignKey('judgments.number'),
+                               primary_key = True),
+                        Column('judge', String(50), ForeignKey('judges.name'),
+                               primary_key = True),
+                        Column('year', Integer),
+                        Index('ix_judgment_judges_judge_year', 'judge',
+                              'year'))
+
 class Judge(Base):
 
     __tablename__ = 'judges'
@@ -57,11 +371,11 @@ class Judge(Base):
     start_year = Column(Integer)
     end_year = Column(Integer)
     home_court = Column(String(100), ForeignKey('courts.name'))
-    other_courts = relationship('Court', uselist = True,
-                                back_populates = 'name')
-    active_date : Column(Date)
-    senior_date : Column(Date)
-    end_date : Column(Date)
+    court = relationship('Court', back_populates = 'judges')
+    other_courts : object = None
+    active_date = Column(Date)
+    senior_date = Column(Date)
+    end_date = Column(Date)
     appointment : object = None
     behavior : object = None
     demographics : object = None
@@ -76,31 +390,35 @@ class Court(Base):
     number = Column(Integer)
     start_year = Column(Integer)
     end_year = Column(Integer)
-    jurisdiction : Column(String(20), ForeignKey('jurisdictions.name'))
-    level : Column(String(20))
-    judges = relationship('Judge', uselist = True, back_populates = 'name')
+    jurisdiction = Column(String(20))
+    level = Column(String(20))
+    judges = relationship('Judge', uselist = True, back_populates = 'court')
     lower_courts : object = None
     geography : object = None
     higher_courts : object = None
     judgments : object = None
     time_table : object = None
 
-class Judgment(Entity):
+class Judgment(Base):
+
+    __tablename__ = 'judgments'
+    __table_args__ = (Index('ix_judgments_court_year', 'court', 'year'),)
 
     number = Column(Integer, primary_key = True)
+    court = Column(String(100), ForeignKey('courts.name'))
+    year = Column(Integer)
     sections : object = None
     parties : object = None
-    court : object = None
     docket_numbers = Column(String(100))
     cites : object = None
-    precedental : Column(Boolean)
+    precedental = Column(Boolean)
     notice : object = None
     dates : object = None
     history : object = None
     future : object = None
     counsel : object = None
     disposition_header : object = None
-    author : object = None
+    author = Column(String(50), ForeignKey('judges.name'))
     judges : object = None
     majority : object = None
     concurrences : object = None
@@ -0,0 +1,444 @@
+"""
+Columnar storage for large numbers of judgments, judges, and other entities.
+"""
+from dataclasses import dataclass
+import re
+
+import numpy as np
+import pandas as pd
+
+from .judge import Judge
+from .judgment import Judgment
+
+
+# Columns of a cleaned cases dataframe for the fields of Judgment.
+JUDGMENT_FIELDS = {'number' : 'index',
+                   'court' : 'court_num',
+                   'year' : 'year',
+                   'author' : 'author_name',
+                   'judges' : 'judge_name'}
+
+# Columns of the judges biographies dataframe (fjc_bios.csv) for the fields
+# of Judge.
+JUDGE_FIELDS = {'name' : 'full_name',
+                'number' : 'nid',
+                'start_year' : 'start_year',
+                'end_year' : 'end_year',
+                'home_court' : 'court',
+                'active_date' : 'start_date',
+                'senior_date' : 'senior_status_date',
+                'end_date' : 'term_date',
+                'ideology_party' : 'party'}
+
+
+def _code_type(size):
+    """Returns the smallest signed integer type which holds codes up to
+    size (with -1 for missing values).
+    """
+    for code_type in [np.int8, np.int16, np.int32]:
+        if size < np.iinfo(code_type).max:
+            return code_type
+    return np.int64
+
+
+def _stub_columns(df, stub):
+    """Returns the columns of df named stub followed by a panel position
+    starting at 1, in position order.
+    """
+    positions = {}
+    for col in df.columns:
+        match = re.fullmatch(r'(.*?)(\d+)', str(col))
+        if match and match.group(1) == stub:
+            positions[int(match.group(2))] = col
+    return [positions[i] for i in sorted(positions)]
+
+
+def _encode(values, categories = None):
+    """Returns integer codes (-1 for missing values) for values and the
+    categories they index. If categories is passed, values which are not in
+    it are added to the end.
+    """
+    flat = pd.Series(np.asarray(values, dtype = object).ravel())
+    if categories is None:
+        codes, categories = pd.factorize(flat)
+        categories = pd.Index(categories)
+    else:
+        new = pd.Index(flat.dropna().unique()).difference(categories,
+                                                          sort = False)
+        categories = categories.append(new)
+        codes = categories.get_indexer(flat)
+        codes[flat.isna().to_numpy()] = -1
+    codes = codes.astype(_code_type(len(categories)))
+    return codes.reshape(np.shape(values)), categories
+
+
+def _compact(values):
+    """Returns values as a numpy array of the smallest lossless type."""
+    values = pd.Series(values)
+    if values.dtype.kind in 'iu':
+        values = pd.to_numeric(values, downcast = 'integer')
+    elif values.dtype.kind not in 'bfmM':
+        return values.to_numpy(dtype = object)
+    return values.to_numpy()
+
+
+@dataclass
+class EntityStore(object):
+    """Stores the fields of many entities of one kind (such as Judgment) in
+    an array for each field rather than in an object for each entity.
+
+    Each entity is a row of the arrays and its id is its row position.
+    Fields in categories (such as court or judge names) are stored as integer
+    codes into a shared index of values. Fields with more than one value per
+    entity (such as the judges on a panel) are 2-D arrays with -1 for empty
+    positions. Numbers and dates are kept in typed arrays.
+
+    The store works like the dictionaries of entities it replaces: indexing
+    by key returns a light EntityView of that row, which reads its fields
+    from the arrays when they are used. Fields which are not stored are read
+    from a default instance of entity.
+
+    Entities added with update are held in a buffer (and returned as they
+    are by key) until the arrays are next read, when all of them are written
+    to the arrays at once (see compact). Adding entities one at a time, as
+    Court.add_judge and Court.add_judgment do, therefore does not copy every
+    array for each entity.
+
+    Attributes:
+        entity: class of the entities stored. Its default instance supplies
+            values (and properties) for fields which are not stored.
+        key: field used as the key for each entity. If it is empty, ids are
+            the keys.
+        fields: dictionary of field names and arrays.
+        categories: dictionary of field names and the index of values which
+            the codes in the field refer to.
+    """
+    entity : object = None
+    key : str = ''
+    fields : object = None
+    categories : object = None
+
+    def __post_init__(self):
+        self.fields = self.fields or {}
+        self.categories = self.categories or {}
+        self.default = self.entity() if self.entity is not None else None
+        self._key_index = None
+        self._pending = {}
+        return
+
+    def __contains__(self, key):
+        return key in self._pending or key in self._stored_keys()
+
+    def __getitem__(self, key):
+        if key in self._pending:
+            return self._pending[key]
+        row = self._stored_keys().get_loc(key)
+        if not isinstance(row, (int, np.integer)):
+            error = str(key) + ' is not a unique key in the store'
+            raise KeyError(error)
+        return EntityView(self, row)
+
+    def __iter__(self):
+        return iter(self.key_index)
+
+    def __len__(self):
+        self.compact()
+        return self._stored_rows()
+
+    @property
+    def key_index(self):
+        """Returns an index of the key of each row."""
+        self.compact()
+        return self._stored_keys()
+
+    def _decode(self, name, rows = None):
+        values = self.fields[name]
+        if rows is not None:
+            values = values[rows]
+        if name in self.categories:
+            categories = np.append(self.categories[name].to_numpy(
+                    dtype = object), np.nan)
+            values = categories[np.where(values < 0, len(categories) - 1,
+                                         values)]
+        return values
+
+    def _stored_keys(self):
+        """Returns an index of the key of each row in the arrays, leaving
+        out buffered entities.
+        """
+        if self._key_index is None:
+            if self.key:
+                self._key_index = pd.Index(self._decode(self.key))
+            else:
+                self._key_index = pd.RangeIndex(self._stored_rows())
+        return self._key_index
+
+    def _stored_rows(self):
+        if not self.fields:
+            return 0
+        return len(next(iter(self.fields.values())))
+
+    def add_field(self, name, values, category = False):
+        """Adds (or replaces) the array for field name.
+
+        If category is True, values are stored as codes with a new index of
+        categories. category may also be an existing index (such as the
+        names of the judges in another store) so that the codes of both
+        stores refer to the same values.
+        """
+        self.compact()
+        if category is not False:
+            if category is True:
+                category = None
+            values, self.categories[name] = _encode(values, category)
+        elif np.ndim(values) > 1:
+            values = np.asarray(values)
+        else:
+            values = _compact(values)
+        if self.fields and len(values) != len(self):
+            error = (name + ' has ' + str(len(values)) + ' rows but the store'
+                     + ' has ' + str(len(self)))
+            raise ValueError(error)
+        self.fields[name] = values
+        if category is False:
+            self.categories.pop(name, None)
+        if name == self.key:
+            self._key_index = None
+        return self
+
+    def _merge(self, name, rows, entities):
+        """Returns the array for field name with the values of entities
+        written to rows (or appended, where rows is -1).
+        """
+        old = self.fields[name]
+        values = [getattr(entity, name, None) for entity in entities]
+        new = rows < 0
+        if old.ndim > 1:
+            values = [list(value or []) for value in values]
+            width = max([old.shape[1]] + [len(value) for value in values])
+            values = [value + [None] * (width - len(value))
+                      for value in values]
+            values = np.array(values, dtype = object).reshape(-1, width)
+            padding = np.full((len(old), width - old.shape[1]),
+                              -1 if name in self.categories else None,
+                              dtype = old.dtype)
+            old = np.hstack([old, padding])
+        if name in self.categories:
+            values, self.categories[name] = _encode(values,
+                                                    self.categories[name])
+        elif old.dtype.kind == 'M':
+            values = pd.to_datetime(pd.Series(values),
+                                    errors = 'coerce').to_numpy()
+        elif old.ndim == 1:
+            values = _compact(values)
+        merged = np.concatenate([old, values[new]])
+        merged[rows[~new]] = values[~new]
+        return merged
+
+    def codes(self, name):
+        """Returns the category codes of field name."""
+        self.compact()
+        return self.fields[name]
+
+    def column(self, name, rows = None):
+        """Returns the values of field name (for rows, if passed), with
+        category codes replaced by their values.
+        """
+        self.compact()
+        return self._decode(name, rows)
+
+    def compact(self):
+        """Writes the entities buffered by update to the arrays, replacing
+        the rows of keys which are already in the store and appending the
+        others. Each array is copied once for all of the buffered entities.
+        """
+        if self._pending:
+            entities = self._pending
+            self._pending = {}
+            if self.key:
+                rows = self._stored_keys().get_indexer(list(entities))
+            else:
+                size = self._stored_rows()
+                rows = np.array([key if 0 <= key < size else -1
+                                 for key in entities])
+            for name in list(self.fields):
+                self.fields[name] = self._merge(name, rows,
+                                                list(entities.values()))
+            self._key_index = None
+        return self
+
+    def get(self, key, default = None):
+        if key in self:
+            return self[key]
+        return default
+
+    def ids(self, keys):
+        """Returns the id of each key in keys (-1 if it is not in the
+        store).
+        """
+        return self.key_index.get_indexer(keys)
+
+    def items(self):
+        return zip(self.key_index, self.values())
+
+    def keys(self):
+        return self.key_index
+
+    def memory_usage(self):
+        """Returns the number of bytes used by the fields and categories."""
+        self.compact()
+        total = sum(values.nbytes for values in self.fields.values())
+        total += sum(categories.memory_usage(deep = True)
+                     for categories in self.categories.values())
+        return total
+
+    def select(self, rows):
+        """Returns a store with rows (a boolean mask or array of ids) which
+        shares the categories of this store.
+        """
+        self.compact()
+        return EntityStore(entity = self.entity, key = self.key,
+                           fields = {name : values[rows]
+                                     for name, values in self.fields.items()},
+                           categories = dict(self.categories))
+
+    def value(self, name, row):
+        """Returns the value of field name for row."""
+        self.compact()
+        value = self.fields[name][row]
+        if name in self.categories:
+            categories = self.categories[name]
+            if np.ndim(value) > 0:
+                return [categories[code] for code in value if code >= 0]
+            return categories[value] if value >= 0 else None
+        elif np.ndim(value) > 0:
+            return [item for item in value if pd.notna(item)]
+        elif isinstance(value, np.datetime64):
+            return None if np.isnat(value) else pd.Timestamp(value)
+        elif isinstance(value, np.generic):
+            return value.item()
+        return value
+
+    def update(self, entities):
+        """Adds entities (a dictionary of keys and entities, such as Judge
+        instances) to the store, replacing the rows of keys which are already
+        in it.
+
+        The entities are buffered until the arrays are next read, so that
+        the arrays are copied once for many entities rather than for each of
+        them. Bulk data should still be loaded with store_from_df.
+        """
+        self._pending.update(entities)
+        return self
+
+    def values(self):
+        return (EntityView(self, row) for row in range(len(self)))
+
+
+class EntityView(object):
+    """Entity for one row of an EntityStore.
+
+    Attributes are read from the store when they are used, so a view only
+    holds the store and its row.
+    """
+    __slots__ = ('store', 'row')
+
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+        return
+
+    def __eq__(self, other):
+        return (isinstance(other, EntityView) and other.store is self.store
+                and other.row == self.row)
+
+    def __getattr__(self, name):
+        store = object.__getattribute__(self, 'store')
+        if name in store.fields:
+            return store.value(name, object.__getattribute__(self, 'row'))
+        elif store.default is not None:
+            return getattr(store.default, name)
+        else:
+            error = name + ' is not a field of the store'
+            raise AttributeError(error)
+
+    def __hash__(self):
+        return hash((id(self.store), self.row))
+
+    def __repr__(self):
+        return ('EntityView(' + ', '.join(
+                name + '=' + repr(getattr(self, name))
+                for name in self.store.fields) + ')')
+
+
+def store_from_df(df, fields, entity = None, key = '', categories = None):
+    """Returns an EntityStore with a row for each row of df.
+
+    fields is a dictionary of field names and columns of df. If a column is
+    not in df but there are columns named with it followed by a panel
+    position (such as 'judge_name1', 'judge_name2', ...), they are stored
+    together in a 2-D field. Fields in categories (a list of field names or a
+    dictionary of field names and existing indexes of values) are stored as
+    codes. Columns which are not in df are skipped.
+    """
+    if categories is None:
+        categories = []
+    if not isinstance(categories, dict):
+        categories = {name : True for name in categories}
+    store = EntityStore(entity = entity, key = key)
+    for name, col in fields.items():
+        if col in df:
+            values = df[col].to_numpy()
+        elif col == 'index':
+            values = df.index.to_numpy()
+        elif _stub_columns(df, col):
+            values = df[_stub_columns(df, col)].to_numpy(dtype = object)
+        else:
+            continue
+        store.add_field(name, values,
+                        category = categories.get(name, False))
+    return store
+
+
+def judgment_store(df, judges = None, fields = None):
+    """Returns an EntityStore of Judgment entities for a cleaned cases
+    dataframe.
+
+    Courts, authors, and panel judges are stored as codes. If judges (an
+    EntityStore made by judge_store) is passed, authors and panel judges
+    share its name categories, so codes below len(judges) are judge ids.
+    Names which are not in judges get the codes after those.
+    """
+    if fields is None:
+        fields = JUDGMENT_FIELDS
+    names = True
+    if judges is not None and judges.key in judges.categories:
+        names = judges.categories[judges.key]
+    return store_from_df(df = df, fields = fields, entity = Judgment,
+                         key = 'number',
+                         categories = {'court' : True,
+                                       'author' : names,
+                                       'judges' : names})
+
+
+def judge_store(df, fields = None):
+    """Returns an EntityStore of Judge entities keyed by name for a judges
+    biographies dataframe.
+
+    The biographies have a row for each appointment, so judges appointed to
+    more than one court are kept with their last appointment (as in
+    add_bios) to make the names unique keys. end_year in the biographies is
+    the last year served, so one is added to match Judge, whose end_year is
+    the first year after service.
+    """
+    if fields is None:
+        fields = JUDGE_FIELDS
+    df = df.drop_duplicates(subset = fields['name'], keep = 'last').copy()
+    for col in ['start_date', 'senior_status_date', 'term_date']:
+        if col in df:
+            df[col] = pd.to_datetime(df[col], errors = 'coerce')
+    if 'end_year' in df:
+        df['end_year'] = df['end_year'] + 1
+    return store_from_df(df = df, fields = fields, entity = Judge,
+                         key = 'name',
+                         categories = ['name', 'home_court'])
\ No newline at end of file
@@ -0,0 +1,44 @@
+"""
+.. module:: courtpy_implements
+  :synopsis: implementation tools for CourtPy
+"""
+
+from .archive import CaseArchive
+from .batch import ColumnBatch
+from .manifest import HarvestManifest, hash_file
+from .matcher import UniqueMatcher
+from .normalizer import normalize_characters, normalize_lexis
+from .panels import PanelCleaner, clean_panel_column, explode_panel
+from .panels import PanelTensor, panel_array, panel_tensor, vote_codes
+from .panels import VOTE_AUTHOR, VOTE_CONCUR, VOTE_DISSENT
+from .patterns import PatternSet
+from .rules import RuleSet
+from .writers import BatchWriter
+from .years import YearTable
+
+
+__version__ = '0.1.0'
+
+__author__ = 'Corey Rayburn Yung'
+
+__all__ = ['VOTE_AUTHOR',
+           'VOTE_CONCUR',
+           'VOTE_DISSENT',
+           'BatchWriter',
+           'CaseArchive',
+           'ColumnBatch',
+           'HarvestManifest',
+           'PanelCleaner',
+           'PanelTensor',
+           'PatternSet',
+           'RuleSet',
+           'UniqueMatcher',
+           'YearTable',
+           'clean_panel_column',
+           'explode_panel',
+           'hash_file',
+           'normalize_characters',
+           'normalize_lexis',
+           'panel_array',
+           'panel_tensor',
+           'vote_codes']
@@ -0,0 +1,145 @@
+"""
+Packed archive of court opinion texts.
+"""
+from dataclasses import dataclass
+import csv
+import glob
+import os
+
+
+@dataclass
+class CaseArchive(object):
+    """Stores court opinions in large append-only data files with an index
+    of where each opinion is.
+
+    Opinions are appended to 'cases_00000.dat' (and later data files once a
+    data file reaches max_file_size bytes) in folder. For each opinion, its
+    case number, court number, data file, offset, and length in bytes are
+    added to 'index.csv'. An opinion is only added to the index after it is
+    written and both files are flushed after each opinion, so a partially
+    written opinion is never read. Opinions are read by court number and case
+    number.
+
+    Attributes:
+        folder: folder for the data and index files.
+        max_file_size: size in bytes at which a new data file is started.
+        encoding: encoding of the opinion texts.
+    """
+    folder : str = ''
+    max_file_size : int = 1073741824
+    encoding : str = 'windows-1252'
+
+    def __post_init__(self):
+        self.columns = ['case_num', 'court_num', 'file', 'offset', 'length']
+        self.index_path = os.path.join(self.folder, 'index.csv')
+        self.data_file = None
+        self.index_file = None
+        self.index = self._load_index()
+        return
+
+    def __iter__(self):
+        """Yields (case_num, court_num, text) for each opinion in the order
+        they were added, reading each data file from start to finish.
+        """
+        data_file = None
+        file_name = None
+        for case_num, court_num, entry_file, offset, length in self.index:
+            if entry_file != file_name:
+                if data_file:
+                    data_file.close()
+                file_name = entry_file
+                data_file = open(os.path.join(self.folder, file_name),
+                                 mode = 'rb')
+            data_file.seek(offset)
+            yield (case_num, court_num,
+                   data_file.read(length).decode(self.encoding,
+                                                 errors = 'ignore'))
+        if data_file:
+            data_file.close()
+
+    def __len__(self):
+        return len(self.index)
+
+    def _load_index(self):
+        index = []
+        if os.path.exists(self.index_path):
+            with open(self.index_path, mode = 'r', newline = '') as a_file:
+                for row in csv.DictReader(a_file):
+                    index.append((int(row['case_num']),
+                                  int(row['court_num']),
+                                  row['file'],
+                                  int(row['offset']),
+                                  int(row['length'])))
+        self.positions = {(entry[1], entry[0]) : i
+                          for i, entry in enumerate(index)}
+        return index
+
+    def _open_data_file(self):
+        if self.index:
+            file_number = int(self.index[-1][2][6:11])
+        else:
+            file_number = 0
+        while True:
+            file_name = 'cases_' + str(file_number).zfill(5) + '.dat'
+            file_path = os.path.join(self.folder, file_name)
+            if (not os.path.exists(file_path)
+                    or os.path.getsize(file_path) < self.max_file_size):
+                break
+            file_number += 1
+        self.data_name = file_name
+        self.data_file = open(file_path, mode = 'ab')
+        self.data_file.seek(0, os.SEEK_END)
+        return self
+
+    def append(self, case_num, court_num, text):
+        """Adds text to the archive as case_num of court_num."""
+        if self.data_file is None:
+            os.makedirs(self.folder, exist_ok = True)
+            new_index = not os.path.exists(self.index_path)
+            self.index_file = open(self.index_path, mode = 'a', newline = '')
+            self.index_writer = csv.writer(self.index_file)
+            if new_index:
+                self.index_writer.writerow(self.columns)
+            self._open_data_file()
+        elif self.data_file.tell() >= self.max_file_size:
+            self.data_file.close()
+            self._open_data_file()
+        data = text.encode(self.encoding, errors = 'ignore')
+        offset = self.data_file.tell()
+        self.data_file.write(data)
+        self.data_file.flush()
+        entry = (case_num, court_num, self.data_name, offset, len(data))
+        self.index_writer.writerow(entry)
+        self.index_file.flush()
+        self.positions[(court_num, case_num)] = len(self.index)
+        self.index.append(entry)
+        return self
+
+    def clear(self):
+        """Removes every opinion and data file (including data files which
+        are not in the index), so the archive can be written again from the
+        start.
+        """
+        self.close()
+        for file_path in glob.glob(os.path.join(self.folder, 'cases_*.dat')):
+            os.remove(file_path)
+        if os.path.exists(self.index_path):
+            os.remove(self.index_path)
+        self.index = self._load_index()
+        return self
+
+    def close(self):
+        """Closes the data and index files being appended to."""
+        if self.data_file is not None:
+            self.data_file.close()
+            self.index_file.close()
+            self.data_file = None
+        return self
+
+    def read(self, court_num, case_num):
+        """Returns the text of case_num of court_num."""
+        case_num, court_num, file_name, offset, length = (
+                self.index[self.positions[(court_num, case_num)]])
+        with open(os.path.join(self.folder, file_name), mode = 'rb') as a_file:
+            a_file.seek(offset)
+            return a_file.read(length).decode(self.encoding, errors = 'ignore')
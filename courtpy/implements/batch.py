@@ -0,0 +1,115 @@
+"""
+Staged columns for adding many columns to a pandas dataframe at once.
+"""
+from dataclasses import dataclass
+import time
+import tracemalloc
+
+import pandas as pd
+
+
+@dataclass
+class ColumnBatch(object):
+    """Stages new columns for df and adds them all with a single concat.
+
+    Columns assigned with batch[col] = values are kept in the batch until
+    commit is called (or the with block ends). Reading batch[col] returns the
+    staged column if there is one and the column of df otherwise, so later
+    columns can be computed from earlier ones. Staged columns which replace
+    columns in df keep their place. Other staged columns are added at the end
+    in the order they were first staged.
+
+    When used as a context manager, the time spent inside the with block is
+    stored in times under name. If track_memory is True, the peak memory
+    allocated inside the block is also measured with tracemalloc and stored
+    in peaks. tracemalloc slows down allocations, so it is off by default.
+
+    Attributes:
+        df: pandas dataframe to add columns to.
+        name: name used to report the time and peak memory of the batch.
+        peaks: dictionary for the peak memory (in bytes) of each batch.
+        verbose: whether to print the time and peak memory of the batch.
+        track_memory: whether to measure the peak memory of the batch.
+        times: dictionary for the time (in seconds) of each batch.
+    """
+    df : object = None
+    name : str = ''
+    peaks : object = None
+    verbose : bool = False
+    track_memory : bool = False
+    times : object = None
+
+    def __post_init__(self):
+        self.staged = {}
+        self.peak_memory = 0
+        self.seconds = 0
+        self.started_tracing = False
+        return
+
+    def __contains__(self, col):
+        return col in self.staged or col in self.df
+
+    def __enter__(self):
+        if self.track_memory:
+            self.started_tracing = not tracemalloc.is_tracing()
+            if self.started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        self.seconds = time.perf_counter() - self.started
+        if self.times is not None:
+            self.times[self.name] = self.seconds
+        if self.track_memory:
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+            if self.started_tracing:
+                tracemalloc.stop()
+            if self.peaks is not None:
+                self.peaks[self.name] = self.peak_memory
+        if self.verbose:
+            print(self.name, 'time:', round(self.seconds, 2), 'seconds')
+            if self.track_memory:
+                print(self.name, 'peak memory:',
+                      round(self.peak_memory / 1048576, 1), 'MB')
+        return False
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key in self.staged:
+                return self.staged[key]
+            return self.df[key]
+        return pd.DataFrame({col : self[col] for col in key},
+                            index = self.df.index)
+
+    def __iter__(self):
+        yield from self.df
+        for col in self.staged:
+            if col not in self.df:
+                yield col
+
+    def __len__(self):
+        return len(self.df)
+
+    def __setitem__(self, col, values):
+        if not isinstance(values, pd.Series):
+            values = pd.Series(values, index = self.df.index)
+        self.staged[col] = values.rename(col)
+        return
+
+    def commit(self):
+        """Adds the staged columns to df and returns df."""
+        if self.staged:
+            replaced = [col for col in self.df if col in self.staged]
+            new_df = pd.DataFrame(self.staged, index = self.df.index)
+            order = list(self.df.columns) + [col for col in self.staged
+                                             if col not in self.df]
+            self.df = pd.concat([self.df.drop(columns = replaced), new_df],
+                                axis = 'columns')
+            if replaced:
+                self.df = self.df[order]
+            self.staged = {}
+        return self.df
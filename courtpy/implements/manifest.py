@@ -0,0 +1,162 @@
+"""
+Manifest of harvested files for incremental harvesting.
+"""
+from dataclasses import dataclass
+import csv
+import hashlib
+import heapq
+import os
+
+from simplify.implements import listify
+
+
+def hash_file(file_path, block_size = 1048576):
+    """Returns the sha1 hex digest of the contents of file_path."""
+    digest = hashlib.sha1()
+    with open(file_path, mode = 'rb') as a_file:
+        for block in iter(lambda: a_file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class HarvestManifest(object):
+    """Tracks which source files are already in the harvested output.
+
+    Each source file is stored with a hash of its contents, a hash of the
+    instruction files used to parse it, and the index number of its row in
+    the output. Rows in the output are in index number order. When update is
+    called, files that are new, were modified, or were parsed with different
+    instructions are returned to be harvested again. Files which no longer
+    exist are dropped. If the output file is missing or does not match the
+    manifest, every file is returned.
+
+    Attributes:
+        file_path: path of the manifest .csv file.
+        output_path: path of the harvested .csv file.
+        instruction_paths: path or list of paths of the instruction files.
+        encoding: encoding of the harvested .csv file.
+    """
+    file_path : str = ''
+    output_path : str = ''
+    instruction_paths : object = None
+    encoding : str = 'windows-1252'
+
+    def __post_init__(self):
+        self.columns = ['path', 'content_hash', 'instructions_hash',
+                        'index_number']
+        self.instructions_hash = self._hash_instructions()
+        self.entries = self._load()
+        self.pending = []
+        self.kept = set()
+        return
+
+    def _count_rows(self):
+        with open(self.output_path, mode = 'r', newline = '',
+                  encoding = self.encoding, errors = 'ignore') as a_file:
+            return sum(1 for row in csv.reader(a_file)) - 1
+
+    def _hash_instructions(self):
+        digest = hashlib.sha1()
+        for file_path in sorted(listify(self.instruction_paths)):
+            digest.update(hash_file(file_path).encode())
+        return digest.hexdigest()
+
+    def _load(self):
+        entries = {}
+        if os.path.exists(self.file_path) and os.path.exists(self.output_path):
+            with open(self.file_path, mode = 'r', newline = '',
+                      encoding = 'utf-8') as a_file:
+                for row in csv.DictReader(a_file):
+                    entries[row['path']] = (row['content_hash'],
+                                            row['instructions_hash'],
+                                            int(row['index_number']))
+            if len(entries) != self._count_rows():
+                entries = {}
+        return entries
+
+    def _read_output(self):
+        """Yields (index_number, row) for each row in the output to keep."""
+        indices = sorted(entry[2] for entry in self.entries.values())
+        with open(self.output_path, mode = 'r', newline = '',
+                  encoding = self.encoding, errors = 'ignore') as a_file:
+            reader = csv.reader(a_file)
+            next(reader)
+            for index_number, row in zip(indices, reader):
+                if index_number in self.kept:
+                    yield index_number, row
+
+    def update(self, file_paths):
+        """Returns a list of (index_number, file_path) tuples for files which
+        need to be harvested, in index number order.
+        """
+        next_index = max([entry[2] for entry in self.entries.values()],
+                         default = 0) + 1
+        self.new_entries = {}
+        self.pending = []
+        self.kept = set()
+        for file_path in file_paths:
+            content_hash = hash_file(file_path)
+            if file_path in self.entries:
+                old_hash, old_instructions, index_number = (
+                        self.entries[file_path])
+                if (old_hash == content_hash
+                        and old_instructions == self.instructions_hash):
+                    self.kept.add(index_number)
+                else:
+                    self.pending.append((index_number, file_path))
+            else:
+                index_number = next_index
+                next_index += 1
+                self.pending.append((index_number, file_path))
+            self.new_entries[file_path] = (content_hash,
+                                           self.instructions_hash,
+                                           index_number)
+        self.pending.sort()
+        return self.pending
+
+    def merge(self, delta_path):
+        """Merges the kept rows of the output with the rows harvested to
+        delta_path and saves the new output and manifest.
+
+        Both files are in index number order, so they are merged row by row
+        without loading either into memory.
+        """
+        with open(delta_path, mode = 'r', newline = '',
+                  encoding = self.encoding, errors = 'ignore') as delta_file:
+            reader = csv.reader(delta_file)
+            header = next(reader)
+            delta = zip([index for index, path in self.pending], reader)
+            temp_path = self.output_path + '.tmp'
+            with open(temp_path, mode = 'w', newline = '',
+                      encoding = self.encoding,
+                      errors = 'ignore') as output_file:
+                writer = csv.writer(output_file)
+                writer.writerow(header)
+                if self.entries:
+                    rows = heapq.merge(self._read_output(), delta,
+                                       key = lambda item: item[0])
+                else:
+                    rows = delta
+                for index_number, row in rows:
+                    writer.writerow(row)
+                output_file.flush()
+                os.fsync(output_file.fileno())
+        os.replace(temp_path, self.output_path)
+        os.remove(delta_path)
+        self.entries = self.new_entries
+        self.save()
+        return self
+
+    def save(self):
+        """Writes the manifest to file_path."""
+        temp_path = self.file_path + '.tmp'
+        with open(temp_path, mode = 'w', newline = '',
+                  encoding = 'utf-8') as a_file:
+            writer = csv.writer(a_file)
+            writer.writerow(self.columns)
+            for file_path, entry in sorted(self.entries.items(),
+                                           key = lambda item: item[1][2]):
+                writer.writerow([file_path] + list(entry))
+        os.replace(temp_path, self.file_path)
+        return self
@@ -0,0 +1,74 @@
+"""
+Regular expression matching on the unique values of a column.
+"""
+from dataclasses import dataclass
+
+import pandas as pd
+
+
+# Results of UniqueMatcher for each cache key and set of match arguments,
+# kept so later sources reuse earlier matches.
+_results = {}
+
+
+@dataclass
+class UniqueMatcher(object):
+    """Runs a matcher (such as ReMatch) on the distinct values of in_col
+    instead of on every row.
+
+    The column is factorized, matcher is run on a dataframe of the values
+    which have not been matched before, and its new columns are broadcast
+    back to every row with the codes. Results are cached under cache_key
+    (usually the path of the instructions file) so that later sources reuse
+    them. If the cache for a key has more than cache_size values, only the
+    values of the latest call are kept (and none if there are still too
+    many), so columns of free text do not grow the cache with the corpus.
+    Series (single cases) are passed to matcher unchanged.
+
+    Attributes:
+        matcher: object with a match(df, **kwargs) method which adds columns
+            to df based upon in_col.
+        in_col: name of the column to match if it is not passed to match.
+        cache_key: key for the cached results. Matchers with different
+            instructions or outputs (such as out_type, out_prefix, out_col,
+            or out_suffix) need different keys, so callers include those
+            settings with the instructions path.
+        cache_size: number of matched values to keep in the cache for each
+            key and set of match arguments.
+    """
+    matcher : object = None
+    in_col : str = ''
+    cache_key : object = None
+    cache_size : int = 100000
+
+    def match(self, df, **kwargs):
+        """Returns df with the columns added by matcher."""
+        if not isinstance(df, pd.DataFrame):
+            return self.matcher.match(df = df, **kwargs)
+        in_col = kwargs.get('in_col', self.in_col)
+        key = (self.cache_key, in_col,
+               tuple(sorted((name, repr(value))
+                            for name, value in kwargs.items())))
+        codes, uniques = pd.factorize(df[in_col], use_na_sentinel = False)
+        cached = _results.get(key)
+        if cached is None:
+            unmatched = pd.Index(uniques)
+        else:
+            unmatched = pd.Index(uniques).difference(cached.index,
+                                                     sort = False)
+        if len(unmatched) > 0:
+            matched = self.matcher.match(
+                    df = pd.DataFrame({in_col : unmatched}), **kwargs)
+            matched = matched.set_index(in_col)
+            if cached is not None:
+                matched = pd.concat([cached, matched])
+            cached = _results[key] = matched
+        locations = cached.index.get_indexer(uniques)
+        new_df = cached.iloc[locations[codes]].set_axis(df.index)
+        if len(cached) > self.cache_size:
+            _results.pop(key)
+            if len(uniques) <= self.cache_size:
+                _results[key] = cached.iloc[locations]
+        return pd.concat([df.drop(columns = [col for col in new_df
+                                             if col in df]),
+                          new_df], axis = 'columns')
@@ -5,6 +5,9 @@ import re
 from library.stringer import Stringer
 from utilities.rematch import ReMatch
 
+from .matcher import UniqueMatcher
+from .panels import clean_panel_column, explode_panel
+
 @dataclass
 class Munger(Stringer):
     """
@@ -37,11 +40,15 @@ class Munger(Stringer):
                                               out_prefix = self.sec_prefix,
                                               out_col = self.out_col)
             else:
-                self.section_munger = ReMatch(file_path = self.munge_path,
-                                              out_type = self.data_type,
-                                              in_col = self.source_col,
-                                              out_prefix = self.sec_prefix,
-                                              out_col = self.out_col)
+                self.section_munger = UniqueMatcher(
+                        matcher = ReMatch(file_path = self.munge_path,
+                                          out_type = self.data_type,
+                                          in_col = self.source_col,
+                                          out_prefix = self.sec_prefix,
+                                          out_col = self.out_col),
+                        in_col = self.source_col,
+                        cache_key = (self.munge_path, self.data_type,
+                                     self.sec_prefix, self.out_col))
         elif self.munge_type == 'specific':
             if self.section in ['panel_judges', 'author', 'separate']:
                 self.excess_table = ReMatch(file_path = self.munge_path,
@@ -54,6 +61,17 @@ class Munger(Stringer):
                 self.section_munger = self.munge_year
             elif self.section == 'party':
                 self.section_munger = self.munge_parties
+                self.party_mungers = []
+                for i in range(1, 3):
+                    self.party_mungers.append(UniqueMatcher(
+                            matcher = ReMatch(file_path = self.munge_path,
+                                              out_type = self.data_type,
+                                              in_col = 'party_name' + str(i),
+                                              out_prefix = self.sec_prefix,
+                                              out_suffix = str(i)),
+                            in_col = 'party_name' + str(i),
+                            cache_key = (self.munge_path, self.data_type,
+                                         self.sec_prefix, str(i))))
             elif self.section == 'panel_judges':
                 self.section_munger = self.munge_panel_judges
             elif self.section == 'author':
@@ -113,12 +131,7 @@ class Munger(Stringer):
                 df['sec_' + self.section].str.split(
                         party_pat, expand = True, n = 1))
         df[self.sec_prefix + 'name2'].fillna('', inplace = True)
-        for i in range(1, 3):
-            party_munger = ReMatch(file_path = self.munge_path,
-                                   out_type = self.data_type,
-                                   in_col = 'party_name' + str(i),
-                                   out_prefix = self.sec_prefix,
-                                   out_suffix = str(i))
+        for party_munger in self.party_mungers:
             df = party_munger.match(df = df)
         return df
 
@@ -130,13 +143,12 @@ class Munger(Stringer):
         name_prefix = 'judge_name'
         excess = self.excess_table['judge_excess']
         df = judges.clean_panel(df, self.source_col, excess)
-        df = df.apply(judges.judge_matcher,
-                      in_col = self.source_col,
-                      out_col = fixed_column,
-                      court_num_col = 'court_num',
-                      year_col = 'year',
-                      size_col = size_column,
-                      axis = 'columns')
+        df = judges.judge_matcher(df = df,
+                                  in_col = self.source_col,
+                                  out_col = fixed_column,
+                                  court_num_col = 'court_num',
+                                  year_col = 'year',
+                                  size_col = size_column)
         df = judges.explode_panel(df, fixed_column, name_prefix)
         return df
 
@@ -147,12 +159,11 @@ class Munger(Stringer):
         name_prefix = self.sec_prefix + 'name'
         excess = self.excess_table['author_excess']
         df = judges.clean_panel(df, self.source_col, excess)
-        df = df.apply(judges.judge_matcher,
-                       in_col = self.source_col,
-                       out_col = fixed_column,
-                       court_num_col = 'court_num',
-                       year_col = 'year',
-                       axis = 'columns')
+        df = judges.judge_matcher(df = df,
+                                  in_col = self.source_col,
+                                  out_col = fixed_column,
+                                  court_num_col = 'court_num',
+                                  year_col = 'year')
         df = judges.explode_panel(df, fixed_column, name_prefix)
         return df
 
@@ -162,16 +173,7 @@ class Munger(Stringer):
     def clean_panel(self, df, in_col, excess):
         df = (df.pipe(no_double_space, in_col = in_col)
                 .pipe(no_breaks, in_col = in_col))
-        junk = '(@@|@ @|@ | @)'
-        df[in_col] = (df[in_col].str.upper()
-                                .str.strip()
-                                    .str.replace("[.']", '')
-                                    .str.replace(excess, '@')
-                                    .str.replace('[,()*;:]', '@')
-                                    .str.replace(junk, '@')
-                                    .str.replace(junk, '@')
-                                    .str.replace(junk, '@'))
-        df[in_col] = df[in_col].str.split('@', expand = False)
+        df[in_col] = clean_panel_column(column = df[in_col], excess = excess)
         return df
 
     def judge_matcher(self, row, in_col, out_col, year_col, court_num_col,
@@ -203,11 +205,7 @@ class Munger(Stringer):
         return row
 
     def explode_panel(self, df, in_col, prefix):
-        judge_df = df[in_col].apply(pd.Series)
-        judge_df = judge_df.rename(columns = lambda x : prefix + str(x + 1))
-        new_df = pd.concat([df[:], judge_df[:]], axis=1)
-        return new_df
-        return df
+        return explode_panel(df = df, in_col = in_col, prefix = prefix)
 
     def munge_separate_opinions(self, df, judges):
         if self.settings['general']['verbose']:
@@ -220,21 +218,19 @@ class Munger(Stringer):
         dissent_name_prefix = self.sec_prefix + 'dissent'
         excess = self.excess_table['concur_excess']
         df = judges.clean_panel(df, concur_source_col, excess)
-        df = df.apply(judges.judge_matcher,
-                      in_col = concur_source_col,
-                      out_col = concur_fixed_col,
-                      court_num_col = 'court_num',
-                      year_col = 'year',
-                      axis = 'columns')
+        df = judges.judge_matcher(df = df,
+                                  in_col = concur_source_col,
+                                  out_col = concur_fixed_col,
+                                  court_num_col = 'court_num',
+                                  year_col = 'year')
         df = judges.explode_panel(df, concur_fixed_col, concur_name_prefix)
         df = judges.clean_panel(df,
                                 dissent_source_col,
                                 excess)
-        df = df.apply(judges.judge_matcher,
-                      in_col = dissent_source_col,
-                      out_col = dissent_fixed_col,
-                      court_num_col = 'court_num',
-                      year_col = 'year',
-                      axis = 'columns')
+        df = judges.judge_matcher(df = df,
+                                  in_col = dissent_source_col,
+                                  out_col = dissent_fixed_col,
+                                  court_num_col = 'court_num',
+                                  year_col = 'year')
         df = judges.explode_panel(df, dissent_fixed_col, dissent_name_prefix)
         return df
\ No newline at end of file
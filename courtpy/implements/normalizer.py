@@ -0,0 +1,77 @@
+"""
+Text normalization for court opinions from Lexis-Nexis.
+"""
+import re
+
+
+# Runs of whitespace (other than line breaks), '*', and bracketed page
+# numbers, except single spaces which are already normalized. A run becomes a
+# single space if it has any whitespace and is removed otherwise.
+_CHARACTERS = re.compile(r'(?! (?![^\S\n]|\*|\[[\d*]*\]))'
+                         r'(?:[^\S\n]|\*|\[[\d*]*\])+')
+
+# Line breaks followed by a space and clusters of lines starting with a
+# Lexis-Nexis signal or date stamp together with the empty lines after them.
+_LINES = re.compile(r'(?m)\n |^(?:(?:Signal:|SIGNAL:|As of:|AS OF:)'
+                    r'.*(?:\n|\Z)\n*)+( ?)')
+
+_STAMPS = ['Signal:', 'SIGNAL:', 'As of:', 'AS OF:']
+
+
+def _replace_characters(match):
+    for character in match.group(0):
+        if character.isspace():
+            return ' '
+    return ''
+
+
+def _replace_lines(match):
+    if match.group(1) is None:
+        return '\n'
+    cluster = match.group(0)
+    space = match.group(1)
+    if space:
+        cluster = cluster[:-1]
+    lines = cluster.split('\n')
+    if cluster.endswith('\n'):
+        lines = [(line, True) for line in lines[:-1]]
+    else:
+        lines = ([(line, True) for line in lines[:-1]]
+                 + [(lines[-1], False)])
+    for stamp in _STAMPS:
+        kept = []
+        skip_empty = False
+        for line, has_break in lines:
+            if skip_empty and not line and has_break:
+                skip_empty = False
+                continue
+            skip_empty = False
+            if line.startswith(stamp):
+                skip_empty = has_break
+            else:
+                kept.append((line, has_break))
+        lines = kept
+    text = ''.join(line + '\n' if has_break else line
+                   for line, has_break in lines)
+    if space and not text and match.start() == 0:
+        text = ' '
+    return text
+
+
+def normalize_characters(text):
+    """Removes '*' and bracketed page numbers from text and replaces each run
+    of whitespace other than line breaks with a single space.
+    """
+    return _CHARACTERS.sub(_replace_characters, text)
+
+
+def normalize_lexis(text):
+    """Removes common anomalies in Lexis-Nexis court opinions.
+
+    The result is the same as removing '*' and bracketed page numbers,
+    changing whitespace to spaces, removing double spaces, removing 'Signal:'
+    and 'As of:' lines (in each capitalization) with an empty line after them,
+    and removing spaces at the start of lines, in that order. Characters are
+    changed in one pass over text and lines in one pass over the result.
+    """
+    return _LINES.sub(_replace_lines, normalize_characters(text))
@@ -0,0 +1,358 @@
+"""
+Fixed-width arrays for lists of judges and their attributes on court panels.
+"""
+from dataclasses import dataclass
+from itertools import chain
+import re
+
+import numpy as np
+import pandas as pd
+
+
+# Separators left between names after excess words and punctuation are
+# replaced with '@'.
+_JUNK = re.compile('(@@|@ @|@ | @)')
+_REMOVED = str.maketrans('', '', ".'")
+_SEPARATORS = str.maketrans(',()*;:', '@@@@@@')
+
+# PanelCleaner instances shared by clean_panel_column, keyed by excess.
+_cleaners = {}
+
+# Flags combined in the vote codes returned by vote_codes.
+VOTE_AUTHOR = 1
+VOTE_CONCUR = 2
+VOTE_DISSENT = 4
+
+
+def panel_array(lists, width = None):
+    """Returns a 2-D object array with a row for each list in lists and a
+    column for each position in the longest list (or width). Positions past
+    the end of a list are NaN. Values which are not lists or tuples are
+    treated as lists with one item.
+    """
+    lists = [x if isinstance(x, (list, tuple)) else [x] for x in lists]
+    lengths = np.fromiter((len(x) for x in lists), dtype = np.int64,
+                          count = len(lists))
+    if width is None:
+        width = int(lengths.max()) if len(lengths) else 0
+    lengths = np.minimum(lengths, width)
+    values = np.empty(int(lengths.sum()), dtype = object)
+    values[:] = list(chain.from_iterable(x[:width] for x in lists))
+    panel = np.full((len(lists), width), np.nan, dtype = object)
+    panel[np.arange(width) < lengths[:, np.newaxis]] = values
+    return panel
+
+
+def explode_panel(df, in_col, prefix):
+    """Adds a column to df for each position in the lists in in_col, named
+    prefix followed by the position starting at 1.
+    """
+    panel = panel_array(df[in_col])
+    judge_df = pd.DataFrame(
+            panel, index = df.index,
+            columns = [prefix + str(x + 1) for x in range(panel.shape[1])])
+    return pd.concat([df, judge_df.infer_objects()], axis = 1)
+
+
+def vote_codes(names, authors, concurs, dissents):
+    """Returns an int8 array of vote codes for each judge in names, a 2-D
+    array with a row for each case and a column for each panel position.
+
+    authors, concurs, and dissents are 2-D arrays (such as those returned by
+    panel_array) of the names of the authors of the majority, concurring,
+    and dissenting opinions in each case. A judge's code is the sum of
+    VOTE_AUTHOR, VOTE_CONCUR, and VOTE_DISSENT for each opinion the judge
+    wrote in that case, so 0 is a vote with the majority without writing.
+
+    Names are replaced with integer codes, and each code is combined with
+    its row so that judges are only matched with opinions in the same case.
+    """
+    groups = [np.asarray(group, dtype = object)
+              for group in [names, authors, concurs, dissents]]
+    codes, uniques = pd.factorize(
+            np.concatenate([group.ravel() for group in groups]))
+    width = len(uniques) + 1
+    keys = []
+    start = 0
+    for group in groups:
+        group_codes = codes[start:start + group.size].reshape(group.shape)
+        start += group.size
+        rows = np.arange(group.shape[0], dtype = np.int64)[:, np.newaxis]
+        keys.append(np.where(group_codes >= 0, rows * width + group_codes,
+                             -1))
+    votes = np.zeros(groups[0].shape, dtype = np.int8)
+    filled = keys[0] >= 0
+    for flag, opinion_keys in zip([VOTE_AUTHOR, VOTE_CONCUR, VOTE_DISSENT],
+                                  keys[1:]):
+        matched = filled & np.isin(keys[0], opinion_keys[opinion_keys >= 0])
+        votes[matched] |= flag
+    return votes
+
+
+@dataclass
+class PanelCleaner(object):
+    """Splits panel, author, and separate opinion text into lists of names.
+
+    Each string is uppercased and stripped, periods and apostrophes are
+    removed, matches of excess and the characters ',()*;:' are replaced with
+    '@', runs of '@' and spaces around it are collapsed (with three passes,
+    as before), and the result is split on '@'. The names for each distinct
+    string are kept in a memo of up to memo_size strings because the same
+    panels appear in many cases.
+
+    Attributes:
+        excess: regular expression for words which separate names.
+        memo_size: number of strings to keep in the memo before clearing it.
+    """
+    excess : str = ''
+    memo_size : int = 100000
+
+    def __post_init__(self):
+        self.excess_expression = re.compile(self.excess)
+        self.memo = {}
+        return
+
+    def clean(self, text):
+        """Returns a tuple of the names in text."""
+        if text not in self.memo:
+            if len(self.memo) >= self.memo_size:
+                self.memo.clear()
+            cleaned = text.upper().strip().translate(_REMOVED)
+            cleaned = self.excess_expression.sub('@', cleaned)
+            cleaned = cleaned.translate(_SEPARATORS)
+            for i in range(3):
+                cleaned = _JUNK.sub('@', cleaned)
+            self.memo[text] = tuple(cleaned.split('@'))
+        return self.memo[text]
+
+    def clean_column(self, column):
+        """Returns a series of lists of names for each string in column.
+        Values which are not strings are NaN.
+        """
+        codes, uniques = pd.factorize(column)
+        names = [self.clean(x) if isinstance(x, str) else None
+                 for x in uniques] + [None]
+        cleaned = [np.nan if names[code] is None else list(names[code])
+                   for code in codes]
+        return pd.Series(cleaned, index = column.index, dtype = object)
+
+
+def clean_panel_column(column, excess):
+    """Returns the result of PanelCleaner.clean_column for column, using a
+    shared PanelCleaner for excess.
+    """
+    if excess not in _cleaners:
+        _cleaners[excess] = PanelCleaner(excess = excess)
+    return _cleaners[excess].clean_column(column)
+
+
+def _kind(block):
+    """Returns 'b' if the columns in block hold booleans, 'i' if they are all
+    integer columns, 'f' if they hold other numbers, or None if they are not
+    numeric. Missing values are ignored.
+    """
+    inferred = pd.api.types.infer_dtype(block.to_numpy(dtype = object).ravel(),
+                                        skipna = True)
+    if inferred == 'boolean':
+        return 'b'
+    elif inferred in ['integer', 'floating', 'mixed-integer-float', 'empty']:
+        if all(pd.api.types.is_integer_dtype(dtype) for dtype in block.dtypes):
+            return 'i'
+        return 'f'
+    else:
+        return None
+
+
+def _restore(values, kind):
+    """Returns the float array values with the type pandas would give a column
+    of kind: booleans and integers are kept if nothing is missing. Otherwise,
+    booleans are objects and integers are floats.
+    """
+    missing = np.isnan(values)
+    if kind == 'f':
+        return values
+    elif not missing.any():
+        return values.astype(bool if kind == 'b' else np.int64)
+    elif kind == 'b':
+        restored = values.astype(object)
+        restored[~missing] = values[~missing] != 0
+        return restored
+    return values
+
+
+def panel_tensor(df, stubs, mask_stub = None):
+    """Returns a PanelTensor for the columns in df named with a stub in stubs
+    followed by a panel position starting at 1.
+
+    Stubs with numeric (or boolean) columns are features. Other stubs, such
+    as 'judge_name', are labels. A panel position is filled if mask_stub is
+    not missing for it or, if mask_stub is None, if any feature is not
+    missing for it.
+    """
+    positions = {}
+    for col in df.columns:
+        match = re.fullmatch(r'(.*?)(\d+)', col)
+        if match and match.group(1) in stubs:
+            positions.setdefault(match.group(1), {})[int(match.group(2))] = col
+    width = max([max(cols) for cols in positions.values()], default = 0)
+    features = []
+    kinds = {}
+    dtypes = {}
+    labels = {}
+    blocks = []
+    for stub in stubs:
+        cols = positions.get(stub, {})
+        block = pd.DataFrame(
+                {i : df[cols[i]] if i in cols else np.nan
+                 for i in range(1, width + 1)},
+                index = df.index, columns = range(1, width + 1))
+        kind = _kind(block)
+        dtypes.update({cols[i] : block[i].dtype for i in cols})
+        if kind is None:
+            labels[stub] = block.to_numpy(dtype = object)
+        else:
+            features.append(stub)
+            kinds[stub] = kind
+            blocks.append(block.to_numpy(dtype = float))
+    if blocks:
+        values = np.stack(blocks, axis = 2)
+    else:
+        values = np.empty((len(df), width, 0))
+    if mask_stub is not None:
+        mask = pd.notna(labels[mask_stub] if mask_stub in labels
+                        else values[:, :, features.index(mask_stub)])
+    else:
+        mask = ~np.isnan(values).all(axis = 2)
+    return PanelTensor(values = values, mask = mask, features = features,
+                       kinds = kinds, dtypes = dtypes, labels = labels,
+                       index = df.index)
+
+
+@dataclass
+class PanelTensor(object):
+    """Judge attributes for court panels as a (cases, positions, features)
+    float array with a mask of which panel positions are filled.
+
+    Features are kept as floats with NaN for missing values. The types of
+    the wide columns are kept to restore them in to_wide.
+    Their kinds ('b' for booleans, 'i' for integers, and 'f' for other
+    numbers) give the types of the columns in to_long. Non-numeric
+    attributes (such as judge names) are kept as (cases, positions) object
+    arrays in labels.
+
+    Attributes:
+        values: float array of shape (cases, positions, features).
+        mask: boolean array of shape (cases, positions) which is True for
+            filled panel positions.
+        features: list of feature names (column stubs) in values.
+        kinds: dictionary of the kind of each feature.
+        dtypes: dictionary of the type of each wide column.
+        labels: dictionary of object arrays for non-numeric stubs.
+        index: index of the cases.
+    """
+    values : object = None
+    mask : object = None
+    features : object = None
+    kinds : object = None
+    dtypes : object = None
+    labels : object = None
+    index : object = None
+
+    def __post_init__(self):
+        if self.kinds is None:
+            self.kinds = {feature : 'f' for feature in self.features}
+        if self.dtypes is None:
+            self.dtypes = {}
+        if self.labels is None:
+            self.labels = {}
+        if self.index is None:
+            self.index = pd.RangeIndex(self.values.shape[0])
+        return
+
+    def _reduce(self, values, features):
+        return pd.DataFrame(values, index = self.index, columns = features)
+
+    def _select(self, features):
+        if features is None:
+            features = self.features
+        columns = [self.features.index(feature) for feature in features]
+        values = np.where(self.mask[:, :, np.newaxis],
+                          self.values[:, :, columns], np.nan)
+        return values, features
+
+    def feature(self, name):
+        """Returns the (cases, positions) array of feature name."""
+        return self.values[:, :, self.features.index(name)]
+
+    def sum(self, features = None):
+        """Returns a data frame of the total of each feature for each panel."""
+        values, features = self._select(features)
+        return self._reduce(np.nansum(values, axis = 1), features)
+
+    def count(self, features = None):
+        """Returns a data frame of the number of filled panel positions with
+        a value for each feature.
+        """
+        values, features = self._select(features)
+        return self._reduce((~np.isnan(values)).sum(axis = 1), features)
+
+    def mean(self, features = None):
+        """Returns a data frame of the mean of each feature for each panel.
+        Panels without any values are NaN.
+        """
+        values, features = self._select(features)
+        counts = (~np.isnan(values)).sum(axis = 1)
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            means = np.nansum(values, axis = 1) / counts
+        return self._reduce(np.where(counts > 0, means, np.nan), features)
+
+    def any(self, features = None):
+        """Returns a data frame of whether any judge on each panel has a
+        nonzero value for each feature.
+        """
+        values, features = self._select(features)
+        return self._reduce((np.nan_to_num(values) != 0).any(axis = 1),
+                            features)
+
+    def to_wide(self):
+        """Returns a data frame with a column for each label and feature at
+        each panel position, named with the stub followed by the position.
+        """
+        columns = {}
+        for i in range(self.values.shape[1]):
+            for stub, block in self.labels.items():
+                columns[stub + str(i + 1)] = block[:, i]
+            for j, feature in enumerate(self.features):
+                columns[feature + str(i + 1)] = _restore(
+                        self.values[:, i, j], self.kinds[feature])
+        wide = pd.DataFrame(columns, index = self.index)
+        return wide.astype({column : dtype
+                            for column, dtype in self.dtypes.items()
+                            if column in wide})
+
+    def to_long(self, df = None, position_col = None):
+        """Returns a data frame with a row for each filled panel position and
+        a column for each label and feature.
+
+        Rows are in case order and then panel position order, and are
+        indexed by the index of their case. If df (the wide data frame) is
+        passed, its other columns are repeated in each row for the case. If
+        position_col is not None, the panel position (starting at 1) is added
+        as that column.
+        """
+        cases, positions = np.nonzero(self.mask)
+        columns = {}
+        if position_col is not None:
+            columns[position_col] = positions + 1
+        for stub, block in self.labels.items():
+            columns[stub] = block[cases, positions]
+        for j, feature in enumerate(self.features):
+            columns[feature] = _restore(self.values[cases, positions, j],
+                                        self.kinds[feature])
+        long_df = pd.DataFrame(columns)
+        if df is not None:
+            others = df.drop(columns = [col for col in self.dtypes
+                                        if col in df])
+            long_df = pd.concat([others.iloc[cases].reset_index(drop = True),
+                                 long_df], axis = 'columns')
+        return long_df.set_axis(self.index[cases])
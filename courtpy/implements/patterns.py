@@ -0,0 +1,289 @@
+"""
+Compiled sets of regular expressions loaded from CourtPy instruction files.
+"""
+from dataclasses import dataclass
+import os
+import re
+
+import pandas as pd
+from simplify.implements import listify
+
+try:
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_constants
+    import sre_parse
+
+
+# Characters which str.lower does not fold the same way the re module does
+# when comparing ASCII letters with IGNORECASE.
+_FOLD_TABLE = {0x130 : 'i', 0x131 : 'i', 0x17f : 's'}
+
+
+def fold_case(text):
+    """Lowercases text so that an ASCII literal is a substring of the result
+    exactly where re.IGNORECASE would find it in the original text.
+    """
+    return text.translate(_FOLD_TABLE).lower()
+
+
+def required_literals(pattern, flags = 0, min_length = 3,
+                      max_alternatives = 64):
+    """Returns a tuple of a list of strings, one of which must appear in any
+    string that pattern matches, and whether finding one of those strings is
+    the same as finding pattern.
+
+    Strings are lowercased (and limited to ASCII) if pattern ignores case so
+    that they can be checked against the result of fold_case. If no strings of
+    at least min_length characters are required, (None, False) is returned.
+    """
+    try:
+        expression = re.compile(pattern, flags)
+        parsed = sre_parse.parse(pattern, flags)
+    except re.error:
+        return None, False
+    folded = bool(expression.flags & re.IGNORECASE)
+    exact, required = _literal_info(parsed, folded, max_alternatives)
+    if (exact is not None
+            and not expression.flags & (re.ASCII | re.LOCALE)
+            and _usable(exact, folded)):
+        return _finish(exact, folded), True
+    if required is not None and min(map(len, required)) >= min_length:
+        return _finish(required, folded), False
+    return None, False
+
+
+def _finish(literals, folded):
+    """Removes strings which contain another string in literals."""
+    if folded:
+        literals = [literal.lower() for literal in literals]
+    literals = sorted(set(literals), key = len)
+    finished = []
+    for literal in literals:
+        if not any(shorter in literal for shorter in finished):
+            finished.append(literal)
+    return finished
+
+
+def _usable(literals, folded):
+    if not literals or not all(literals):
+        return False
+    return not folded or all(ord(c) < 128 for c in ''.join(literals))
+
+
+def _best(candidates, folded):
+    """Returns the candidate with the longest shortest string."""
+    candidates = [c for c in candidates if c and _usable(c, folded)]
+    if not candidates:
+        return None
+    return max(candidates,
+               key = lambda c: (min(map(len, c)), -len(set(c))))
+
+
+def _combine(prefixes, suffixes, max_alternatives):
+    if len(prefixes) * len(suffixes) > max_alternatives:
+        return None
+    return [p + s for p in prefixes for s in suffixes]
+
+
+def _literal_info(subpattern, folded, max_alternatives):
+    """Returns a tuple of the exact strings matched by subpattern (or None if
+    it is not made only of literals) and the best set of required strings.
+    """
+    run = ['']
+    is_exact = True
+    candidates = []
+    for op, av in subpattern:
+        exact, required = _item_info(op, av, folded, max_alternatives)
+        combined = None
+        if exact is not None:
+            combined = _combine(run, exact, max_alternatives)
+        if combined is not None:
+            run = combined
+        else:
+            is_exact = False
+            candidates.extend([run, exact, required])
+            run = ['']
+    candidates.append(run)
+    return (run if is_exact else None), _best(candidates, folded)
+
+
+def _item_info(op, av, folded, max_alternatives):
+    if op is sre_constants.LITERAL:
+        return [chr(av)], None
+    elif op is sre_constants.IN:
+        if all(item_op is sre_constants.LITERAL for item_op, _ in av):
+            return [chr(item_av) for _, item_av in av], None
+    elif op is sre_constants.SUBPATTERN:
+        if not av[1] and not av[2]:
+            return _literal_info(av[-1], folded, max_alternatives)
+    elif op is sre_constants.BRANCH:
+        infos = [_literal_info(branch, folded, max_alternatives)
+                 for branch in av[1]]
+        if all(exact is not None for exact, _ in infos):
+            exact = [s for branch_exact, _ in infos for s in branch_exact]
+            if len(exact) <= max_alternatives:
+                return exact, None
+        required = []
+        for exact, branch_required in infos:
+            branch_best = _best([exact, branch_required], folded)
+            if branch_best is None:
+                return None, None
+            required.extend(branch_best)
+        return None, required
+    elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+        minimum, maximum, item = av
+        exact, required = _literal_info(item, folded, max_alternatives)
+        if exact is not None and maximum <= 3:
+            alternatives = []
+            repeated = ['']
+            for count in range(maximum + 1):
+                if count >= minimum:
+                    alternatives.extend(repeated)
+                if count < maximum:
+                    repeated = _combine(repeated, exact, max_alternatives)
+                if repeated is None or len(alternatives) > max_alternatives:
+                    break
+            else:
+                return alternatives, None
+        if minimum >= 1:
+            return None, _best([exact, required], folded)
+    return None, None
+
+
+@dataclass
+class PatternSet(object):
+    """Searches a string for every expression in one or more instruction files
+    in a single call.
+
+    Rows sharing an expression and flags are searched once and the result is
+    reported for every section and value using it. When an expression is
+    loaded, the literal strings it requires are extracted and each string is
+    checked for them (or its folded copy for IGNORECASE) before the regular
+    expression engine is used. Expressions which are only literals (or
+    alternations of literals) are answered by that check alone. Results are
+    the same as searching for each row separately: 'bool' rows report whether
+    the expression is found and 'list', 'pattern', and 'patterns' rows add the
+    results of findall to a list for their section.
+
+    The number of regular expression searches run and avoided are kept in
+    regex_calls and prefilter_skips.
+
+    Attributes:
+        file_paths: path or list of paths to instruction .csv files with
+            'section', 'datatype', 'values', 'dotall', 'ignorecase', and
+            'keys' columns. Files without 'section' and 'datatype' columns
+            (such as those in instructions/federal_archive) are loaded as
+            'bool' rows with the file name as the section.
+        sections: section or list of sections to load. If None, all sections
+            are loaded.
+        encoding: encoding of the instruction files.
+        min_literal_length: shortest required literal used to skip searches.
+    """
+    file_paths : object = None
+    sections : object = None
+    encoding : str = 'windows-1252'
+    min_literal_length : int = 3
+
+    def __post_init__(self):
+        self.search_types = ['bool']
+        self.findall_types = ['list', 'pattern', 'patterns']
+        self.rows = []
+        self.expressions = []
+        self.literals = []
+        self._expression_index = {}
+        self.regex_calls = 0
+        self.prefilter_skips = 0
+        for file_path in listify(self.file_paths):
+            self._load_file(file_path)
+        return
+
+    def _add_expression(self, pattern, flags):
+        key = (pattern, flags)
+        if key not in self._expression_index:
+            self._expression_index[key] = len(self.expressions)
+            expression = re.compile(pattern, flags)
+            self.expressions.append(expression)
+            literals, exact = required_literals(
+                    pattern, flags, min_length = self.min_literal_length)
+            folded = bool(expression.flags & re.IGNORECASE)
+            self.literals.append((literals, folded, exact))
+        return self._expression_index[key]
+
+    def _load_file(self, file_path):
+        df = pd.read_csv(file_path, encoding = self.encoding,
+                         index_col = False)
+        df.columns = [column.lstrip('\ufeff\xef\xbb\xbf')
+                      for column in df.columns]
+        if 'section' not in df.columns:
+            df['section'] = os.path.splitext(os.path.basename(file_path))[0]
+            df['datatype'] = 'bool'
+        df = df[df['datatype'].isin(self.search_types + self.findall_types)]
+        df = df.dropna(subset = ['keys'])
+        for i, row in df.iterrows():
+            flags = 0
+            if row['dotall']:
+                flags |= re.DOTALL
+            if row['ignorecase']:
+                flags |= re.IGNORECASE
+            index = self._add_expression(row['keys'], flags)
+            for section in str(row['section']).split(','):
+                section = section.strip()
+                if not self.sections or section in listify(self.sections):
+                    self.rows.append((section, row['datatype'],
+                                      str(row['values']), index))
+        return self
+
+    def _found(self, index, texts):
+        literals, folded, exact = self.literals[index]
+        if literals is not None:
+            if folded:
+                if len(texts) == 1:
+                    texts.append(fold_case(texts[0]))
+                present = any(literal in texts[1] for literal in literals)
+            else:
+                present = any(literal in texts[0] for literal in literals)
+            if exact or not present:
+                self.prefilter_skips += 1
+                return present
+        self.regex_calls += 1
+        return bool(self.expressions[index].search(texts[0]))
+
+    def scan(self, text):
+        """Returns a list with a (section, datatype, value, result) tuple for
+        each row and its search result in text.
+        """
+        texts = [text]
+        found = {}
+        results = []
+        for section, datatype, value, index in self.rows:
+            if index not in found:
+                found[index] = self._found(index, texts)
+            if datatype in self.search_types:
+                result = found[index]
+            elif found[index]:
+                result = self.expressions[index].findall(text)
+            else:
+                result = []
+            results.append((section, datatype, value, result))
+        return results
+
+    def match(self, df, source):
+        """Adds the results of scanning source to df, a pandas series.
+
+        List results for a section are concatenated, and boolean results of
+        rows with the same section and value are combined with or.
+        """
+        flags = {}
+        for section, datatype, value, result in self.scan(source):
+            if isinstance(result, list):
+                if section not in df or not isinstance(df[section], list):
+                    df[section] = []
+                df[section] = df[section] + result
+            else:
+                column = section + '_' + value
+                flags[column] = flags.get(column, False) or result
+        for column, result in flags.items():
+            df[column] = result
+        return df
@@ -0,0 +1,150 @@
+"""
+Boolean column rules compiled into bitwise operations on packed arrays.
+"""
+from dataclasses import dataclass
+import ast
+
+import numpy as np
+import pandas as pd
+
+
+_OPERATORS = {ast.BitAnd : 'and', ast.BitOr : 'or', ast.BitXor : 'xor'}
+
+_UFUNCS = {'and' : np.bitwise_and, 'or' : np.bitwise_or,
+           'xor' : np.bitwise_xor}
+
+
+@dataclass
+class RuleSet(object):
+    """Derives boolean columns from other boolean columns with the rules for
+    section in a rules .csv file.
+
+    Each row of the file has a section, the column to create, and a rule
+    using column names, True, False, '&', '|', '^', '~', and parentheses
+    (for example, 'type_criminal & (party_us1 | party_us2)'). Rules are
+    applied in file order, so a rule may use columns created (or replaced)
+    by earlier rules.
+
+    The rules are compiled once into a list of operations in which each
+    distinct subexpression appears only once. Input columns are packed into
+    bits, and the operations are run over blocks of chunk_rows rows so that
+    every intermediate array for a block stays small. Intermediate arrays
+    are released after their last use.
+
+    Attributes:
+        file_path: path of the rules .csv file.
+        section: section of the rules to use.
+        chunk_rows: number of rows evaluated at a time.
+        encoding: encoding of the rules file.
+    """
+    file_path : str = ''
+    section : str = ''
+    chunk_rows : int = 65536
+    encoding : str = 'windows-1252'
+
+    def __post_init__(self):
+        self.rules = self._load_rules()
+        self._compile()
+        return
+
+    def _load_rules(self):
+        rules_df = pd.read_csv(self.file_path, encoding = self.encoding,
+                               dtype = str).fillna('')
+        rules_df = rules_df[rules_df['section'] == self.section]
+        return list(zip(rules_df['column'], rules_df['rule']))
+
+    def _add_node(self, key):
+        if key not in self.node_ids:
+            self.node_ids[key] = len(self.nodes)
+            self.nodes.append(key)
+        return self.node_ids[key]
+
+    def _build(self, node, names):
+        if isinstance(node, ast.Name):
+            if node.id not in names:
+                names[node.id] = self._add_node(('input', node.id))
+            return names[node.id]
+        elif isinstance(node, ast.Constant) and isinstance(node.value, bool):
+            return self._add_node(('constant', node.value))
+        elif (isinstance(node, ast.UnaryOp)
+                and isinstance(node.op, (ast.Invert, ast.Not))):
+            operand = self._build(node.operand, names)
+            if self.nodes[operand][0] == 'not':
+                return self.nodes[operand][1]
+            return self._add_node(('not', operand))
+        elif (isinstance(node, ast.BinOp)
+                and type(node.op) in _OPERATORS):
+            left = self._build(node.left, names)
+            right = self._build(node.right, names)
+            return self._add_node((_OPERATORS[type(node.op)],
+                                   min(left, right), max(left, right)))
+        else:
+            error = (ast.dump(node) + ' is not allowed in rules for '
+                     + self.section)
+            raise ValueError(error)
+
+    def _compile(self):
+        """Builds the operations for the rules, merging identical
+        subexpressions, and finds where each intermediate result is last
+        used.
+        """
+        self.nodes = []
+        self.node_ids = {}
+        names = {}
+        for column, rule in self.rules:
+            tree = ast.parse(rule.strip(), mode = 'eval')
+            names[column] = self._build(tree.body, names)
+        self.outputs = {column : names[column] for column, rule in self.rules}
+        self.inputs = [key[1] for key in self.nodes if key[0] == 'input']
+        self.last_use = {}
+        for i, key in enumerate(self.nodes):
+            if key[0] not in ['input', 'constant']:
+                for operand in key[1:]:
+                    self.last_use[operand] = i
+        kept = set(self.outputs.values())
+        self.releases = {}
+        for node, i in self.last_use.items():
+            if node not in kept:
+                self.releases.setdefault(i, []).append(node)
+        return self
+
+    def _evaluate_chunk(self, packed, size):
+        values = {}
+        for i, key in enumerate(self.nodes):
+            if key[0] == 'input':
+                values[i] = packed[key[1]]
+            elif key[0] == 'constant':
+                values[i] = np.full(size, 255 if key[1] else 0,
+                                    dtype = np.uint8)
+            elif key[0] == 'not':
+                values[i] = np.invert(values[key[1]])
+            else:
+                values[i] = _UFUNCS[key[0]](values[key[1]], values[key[2]])
+            for node in self.releases.get(i, []):
+                del values[node]
+        return values
+
+    def evaluate(self, df):
+        """Returns a dictionary of the boolean array for each column created
+        by the rules. df may be a dataframe or a ColumnBatch.
+        """
+        rows = len(df)
+        columns = {column : np.empty(rows, dtype = bool)
+                   for column in self.outputs}
+        inputs = {name : df[name].fillna(False).to_numpy(dtype = bool)
+                  for name in self.inputs}
+        for start in range(0, rows, self.chunk_rows):
+            end = min(start + self.chunk_rows, rows)
+            packed = {name : np.packbits(values[start:end])
+                      for name, values in inputs.items()}
+            values = self._evaluate_chunk(packed, (end - start + 7) // 8)
+            for column, node in self.outputs.items():
+                columns[column][start:end] = np.unpackbits(
+                        values[node], count = end - start).view(bool)
+        return columns
+
+    def apply(self, df):
+        """Adds the columns created by the rules to df and returns df."""
+        for column, values in self.evaluate(df).items():
+            df[column] = values
+        return df
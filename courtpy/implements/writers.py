@@ -0,0 +1,138 @@
+"""
+Buffered writers for exporting parsed cases in batches.
+"""
+from dataclasses import dataclass
+import csv
+import io
+import os
+
+import pandas as pd
+
+
+@dataclass
+class BatchWriter(object):
+    """Collects pandas series in memory and writes them to disk in batches.
+
+    A batch is written when it has batch_rows rows or, if batch_bytes is not
+    0, when its estimated size reaches batch_bytes. Each batch is written in a
+    single call and synced to disk before the next batch is started, so a
+    crash loses, at most, the rows in the unwritten batch.
+
+    For 'csv', rows are appended to file_path after a header of column_list
+    (the same layout as the inventory series writer). For 'parquet', each
+    batch is a separate part file in a folder named after file_path. Part
+    files are written under a temporary name and renamed when complete so
+    that a partial part file is never left behind. 'parquet' requires
+    pyarrow, which is checked when the writer is created.
+
+    Attributes:
+        file_path: path of the exported file (or folder for 'parquet').
+        column_list: list of columns to write for each series.
+        file_format: 'csv' or 'parquet'.
+        batch_rows: number of rows in each batch.
+        batch_bytes: approximate size in bytes of each batch. If 0, only
+            batch_rows is used.
+        encoding: encoding for 'csv' files.
+    """
+    file_path : str = ''
+    column_list : object = None
+    file_format : str = 'csv'
+    batch_rows : int = 1000
+    batch_bytes : int = 0
+    encoding : str = 'windows-1252'
+
+    def __post_init__(self):
+        self.options = {'csv' : self._write_csv,
+                        'parquet' : self._write_parquet}
+        self.rows = []
+        self.size = 0
+        self.rows_written = 0
+        self.batches_written = 0
+        self._start()
+        return
+
+    def _start(self):
+        if self.file_format == 'csv':
+            self.buffer = io.StringIO()
+            self.writer = csv.writer(self.buffer)
+            self.output = open(self.file_path, mode = 'w', newline = '',
+                               encoding = self.encoding, errors = 'ignore')
+            self.writer.writerow(self.column_list)
+            self._sync(self.buffer.getvalue())
+        else:
+            try:
+                import pyarrow
+            except ImportError:
+                error = 'pyarrow is required to write parquet files'
+                raise ImportError(error)
+            self.folder = os.path.splitext(self.file_path)[0]
+            os.makedirs(self.folder, exist_ok = True)
+        return self
+
+    def _sync(self, text):
+        self.output.write(text)
+        self.output.flush()
+        os.fsync(self.output.fileno())
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return self
+
+    def _write_csv(self):
+        self._sync(self.buffer.getvalue())
+        return self
+
+    def _write_parquet(self):
+        df = pd.DataFrame(self.rows, columns = self.column_list)
+        for column in df.columns[df.dtypes == object]:
+            df[column] = df[column].where(df[column].isna(),
+                                          df[column].astype(str))
+        part_path = os.path.join(
+                self.folder, 'part-' + str(self.batches_written).zfill(5)
+                + '.parquet')
+        temp_path = part_path + '.tmp'
+        try:
+            with open(temp_path, mode = 'wb') as part_file:
+                df.to_parquet(part_file, engine = 'pyarrow', index = False)
+                part_file.flush()
+                os.fsync(part_file.fileno())
+            os.replace(temp_path, part_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return self
+
+    def save(self, series):
+        """Adds series to the current batch and writes the batch if it is
+        full.
+        """
+        if self.column_list is not None:
+            series = series.reindex(self.column_list)
+        row = series.tolist()
+        if self.file_format == 'csv':
+            start = self.buffer.tell()
+            self.writer.writerow(row)
+            self.size += self.buffer.tell() - start
+        else:
+            self.size += sum(len(str(value)) for value in row)
+        self.rows.append(row)
+        if (len(self.rows) >= self.batch_rows
+                or (self.batch_bytes and self.size >= self.batch_bytes)):
+            self.flush()
+        return self
+
+    def flush(self):
+        """Writes the current batch to disk."""
+        if self.rows:
+            self.options[self.file_format]()
+            self.rows_written += len(self.rows)
+            self.batches_written += 1
+            self.rows = []
+            self.size = 0
+        return self
+
+    def close(self):
+        """Writes any remaining rows and closes the output file."""
+        self.flush()
+        if self.file_format == 'csv':
+            self.output.close()
+        return self
@@ -0,0 +1,92 @@
+"""
+Dense lookup tables for data keyed by year.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class YearTable(object):
+    """Stores values keyed by year in arrays with a row for each year from
+    start_year to end_year.
+
+    Each row is at year - start_year, so values for a column of years are
+    gathered with a single indexing operation instead of a dictionary
+    lookup for each case. Years which are missing, outside the range, or not
+    in the source data get NaN. If a year appears more than once in the
+    source data, the last value is kept.
+
+    Attributes:
+        start_year: first year in the table.
+        end_year: last year in the table.
+        prefix: prefix added to the names of the columns made by apply.
+    """
+    start_year : int = 1980
+    end_year : int = 2016
+    prefix : str = 'politics_'
+
+    def __post_init__(self):
+        self.size = self.end_year - self.start_year + 1
+        self.columns = {}
+        return
+
+    def _positions(self, years):
+        """Returns the row of each year in years, with the extra last row
+        for years which are missing or out of range.
+        """
+        years = pd.to_numeric(pd.Series(years), errors = 'coerce').to_numpy(
+                dtype = float)
+        positions = years - self.start_year
+        valid = (~np.isnan(positions) & (positions >= 0)
+                 & (positions < self.size) & (positions % 1 == 0))
+        return np.where(valid, positions, self.size).astype(np.int64)
+
+    def add_values(self, name, years, values):
+        """Adds a column called name with values for each year in years."""
+        values = pd.Series(values).to_numpy()
+        if values.dtype.kind in 'biuf':
+            column = np.full(self.size + 1, np.nan)
+        else:
+            column = np.full(self.size + 1, np.nan, dtype = object)
+        positions = self._positions(years)[::-1]
+        values = values[::-1]
+        positions, last = np.unique(positions, return_index = True)
+        found = positions < self.size
+        column[positions[found]] = values[last[found]]
+        self.columns[name] = column
+        return self
+
+    def add_dicts(self, df, dicts):
+        """Adds a column for each entry in dicts (a dictionary of names and
+        [key column, value column] lists) which is keyed by 'year' in df.
+        """
+        for name, (key_col, value_col) in dicts.items():
+            if key_col == 'year':
+                self.add_values(name, df[key_col], df[value_col])
+        return self
+
+    def lookup(self, years):
+        """Returns a dataframe with the value of each column for each year in
+        years.
+        """
+        positions = self._positions(years)
+        names = list(self.columns)
+        if names and all(self.columns[name].dtype != object
+                         for name in names):
+            table = np.column_stack([self.columns[name] for name in names])
+            return pd.DataFrame(table[positions], columns = names)
+        return pd.DataFrame({name : self.columns[name][positions]
+                             for name in names},
+                            index = pd.RangeIndex(len(positions)))
+
+    def apply(self, df, year_col = 'year'):
+        """Adds the columns in the table (named prefix + name) to df for the
+        years in year_col and returns df.
+        """
+        values = self.lookup(df[year_col]).set_axis(df.index)
+        values.columns = [self.prefix + name for name in values.columns]
+        return pd.concat([df.drop(columns = [col for col in values
+                                             if col in df]),
+                          values], axis = 'columns')
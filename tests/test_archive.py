@@ -0,0 +1,57 @@
+"""
+Tests for the packed case archive.
+"""
+import os
+
+from courtpy.implements import CaseArchive
+
+
+CASES = [(10000001, 1000, 'First opinion.'),
+         (10000002, 1000, 'Second opinion, with more text.'),
+         (10000001, 1001, 'Same case number in another court.'),
+         (10000003, 1000, 'Fourth opinion – with a dash.')]
+
+
+def fill(folder, max_file_size = 1073741824):
+    archive = CaseArchive(folder = folder, max_file_size = max_file_size,
+                          encoding = 'utf-8')
+    for case_num, court_num, text in CASES:
+        archive.append(case_num = case_num, court_num = court_num,
+                       text = text)
+    return archive
+
+
+def test_opinions_are_read_in_order_and_by_court(tmp_path):
+    folder = str(tmp_path / 'lexis_cases')
+    fill(folder, max_file_size = 40).close()
+    archive = CaseArchive(folder = folder, encoding = 'utf-8')
+    assert len(archive) == len(CASES)
+    assert list(archive) == CASES
+    assert len(set(entry[2] for entry in archive.index)) > 1
+    for case_num, court_num, text in CASES:
+        assert archive.read(court_num = court_num,
+                            case_num = case_num) == text
+
+
+def test_index_is_written_with_each_opinion(tmp_path):
+    folder = str(tmp_path / 'lexis_cases')
+    archive = fill(folder)
+    reader = CaseArchive(folder = folder, encoding = 'utf-8')
+    assert list(reader) == CASES
+    archive.close()
+
+
+def test_clear_removes_every_data_file(tmp_path):
+    folder = str(tmp_path / 'lexis_cases')
+    archive = fill(folder, max_file_size = 40)
+    archive.close()
+    orphan = os.path.join(folder, 'cases_00099.dat')
+    with open(orphan, mode = 'wb') as a_file:
+        a_file.write(b'unindexed opinion')
+    archive.clear()
+    assert os.listdir(folder) == []
+    assert len(archive) == 0
+    archive.append(case_num = 1, court_num = 1000, text = 'New opinion.')
+    archive.close()
+    assert list(CaseArchive(folder = folder, encoding = 'utf-8')) == [
+            (1, 1000, 'New opinion.')]
@@ -0,0 +1,38 @@
+"""
+Tests for staging columns in a ColumnBatch.
+"""
+import tracemalloc
+
+import pandas as pd
+
+from courtpy.implements import ColumnBatch
+
+
+def test_staged_columns_are_added_in_place_and_in_order():
+    df = pd.DataFrame({'a' : [1, 2], 'b' : [3, 4]})
+    times = {}
+    with ColumnBatch(df = df, name = 'test', times = times) as batch:
+        batch['c'] = batch['a'] + batch['b']
+        batch['a'] = [10, 20]
+        batch['d'] = batch['c'] * 2
+        assert list(batch) == ['a', 'b', 'c', 'd']
+    assert list(batch.df.columns) == ['a', 'b', 'c', 'd']
+    assert batch.df['a'].tolist() == [10, 20]
+    assert batch.df['d'].tolist() == [8, 12]
+    assert list(df.columns) == ['a', 'b']
+    assert times['test'] >= 0
+
+
+def test_memory_is_only_traced_when_tracked():
+    df = pd.DataFrame({'a' : range(1000)})
+    peaks = {}
+    with ColumnBatch(df = df, name = 'untracked', peaks = peaks) as batch:
+        assert not tracemalloc.is_tracing()
+        batch['b'] = batch['a'] * 2
+    assert 'untracked' not in peaks
+    with ColumnBatch(df = df, name = 'tracked', peaks = peaks,
+                     track_memory = True) as batch:
+        assert tracemalloc.is_tracing()
+        batch['b'] = batch['a'] * 2
+    assert not tracemalloc.is_tracing()
+    assert peaks['tracked'] > 0
@@ -0,0 +1,156 @@
+"""
+Tests for court time tables and columnar entity stores.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from courtpy.entities.court import Court
+from courtpy.entities.judge import Appointment, Judge
+from courtpy.entities.judgment import Judgment
+from courtpy.entities.store import judge_store, judgment_store
+
+
+BIOS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                         'courtpy', 'instructions', 'combiners',
+                         'biographies', 'federal', 'fjc_bios.csv')
+
+
+def load_bios(rows = 400):
+    bios = pd.read_csv(BIOS_PATH, encoding = 'windows-1252')
+    return bios.iloc[:rows]
+
+
+def judge_objects(store):
+    """Returns a dictionary of Judge instances with the values in store."""
+    judges = {}
+    for name, view in store.items():
+        judges[name] = Judge(
+                name = name,
+                start_year = view.start_year,
+                end_year = view.end_year,
+                active_date = view.active_date,
+                senior_date = view.senior_date,
+                end_date = view.end_date,
+                appointment = Appointment(
+                        executive_party = view.ideology_party))
+    return judges
+
+
+def random_cases(names, size = 3000, seed = 21):
+    generator = np.random.default_rng(seed)
+    cases = pd.DataFrame({
+            'court_num' : 1000,
+            'year' : generator.integers(1975, 2020, size).astype(float),
+            'author_name' : generator.choice(names, size),
+            'judge_name1' : generator.choice(names, size),
+            'judge_name2' : generator.choice(names, size)})
+    cases.loc[::50, 'year'] = np.nan
+    return cases
+
+
+def year_totals(judges, judgments, year):
+    """Returns the time table row for year, counted member by member."""
+    def serves(judge):
+        return judge.start_year <= year < judge.end_year
+
+    def began(date):
+        return date is not None and date.year <= year
+
+    def ended(date):
+        return date is not None and date.year <= year
+
+    party = [judge.ideology_party for judge in judges.values()
+             if serves(judge)]
+    return {'ideology_party' : float(sum(party)),
+            'ideology_special' : 0.0,
+            'num_judges' : float(len(party)),
+            'num_active_judges' : float(sum(
+                    serves(judge) and began(judge.active_date)
+                    and not ended(judge.senior_date)
+                    for judge in judges.values())),
+            'num_senior_judges' : float(sum(
+                    serves(judge) and began(judge.senior_date)
+                    and not ended(judge.end_date)
+                    for judge in judges.values())),
+            'num_judgments' : float(sum(
+                    judgment.year == year
+                    for judgment in judgments.values())),
+            'num_affirmances' : 0.0,
+            'num_reversals' : 0.0}
+
+
+def test_store_time_table_matches_member_totals():
+    judges = judge_store(load_bios())
+    names = np.array(list(judges.keys()))
+    judgments = judgment_store(random_cases(names), judges = judges)
+    court = Court(name = 'test', start_year = 1970, end_year = 2021)
+    court.judges = judges
+    court.judgments = judgments
+    court.create_time_table()
+    judge_dict = judge_objects(judges)
+    judgment_dict = {number : Judgment(number = number, year = view.year)
+                     for number, view in judgments.items()}
+    for year in [1970, 1980, 1995, 2005, 2016, 2020]:
+        row = court.time_table.loc[year].to_dict()
+        assert row == year_totals(judge_dict, judgment_dict, year), year
+    objects = Court(name = 'test', start_year = 1970, end_year = 2021)
+    objects.judges = judge_dict
+    objects.judgments = judgment_dict
+    objects.create_time_table()
+    pd.testing.assert_frame_equal(court.time_table, objects.time_table)
+
+
+def judgment_objects(cases):
+    return [Judgment(number = number, court = row.court_num,
+                     year = row.year, author = row.author_name,
+                     judges = [row.judge_name1, row.judge_name2])
+            for number, row in cases.iterrows()]
+
+
+def test_updates_are_buffered_until_read():
+    judges = judge_store(load_bios())
+    cases = random_cases(np.array(list(judges.keys())), size = 300)
+    judgments = judgment_store(cases.iloc[:100], judges = judges)
+    years = judgments.fields['year']
+    added = judgment_objects(cases.iloc[100:])
+    for judgment in added:
+        judgments.update({judgment.number : judgment})
+        assert judgment.number in judgments
+        assert judgments[judgment.number] is judgment
+    assert judgments.fields['year'] is years
+    replaced = Judgment(number = 5, court = 1000, year = 1990,
+                        author = added[0].author)
+    judgments.update({5 : replaced})
+    assert judgments[5] is replaced
+    assert len(judgments) == 300
+    assert judgments.fields['year'] is not years
+    expected = cases['year'].to_numpy().copy()
+    expected[5] = 1990
+    np.testing.assert_array_equal(judgments.column('year'), expected)
+    assert list(judgments.keys()) == list(cases.index)
+    assert judgments[5].author == added[0].author
+    assert judgments[250].judges == list(cases.loc[250, ['judge_name1',
+                                                         'judge_name2']])
+
+
+def test_added_judgments_match_rebuilt_table():
+    judges = judge_store(load_bios())
+    cases = random_cases(np.array(list(judges.keys())), size = 1000)
+    court = Court(name = 'test', start_year = 1970, end_year = 2021)
+    court.judges = judges
+    court.judgments = judgment_store(cases.iloc[:500], judges = judges)
+    court.create_time_table()
+    for judgment in judgment_objects(cases.iloc[500:]):
+        court.add_judgment(judgment)
+    court.add_judgment(Judgment(number = 3, court = 1000, year = 2001))
+    cases.loc[3, ['year', 'author_name', 'judge_name1', 'judge_name2']] = [
+            2001, np.nan, np.nan, np.nan]
+    rebuilt = Court(name = 'test', start_year = 1970, end_year = 2021)
+    rebuilt.judges = judges
+    rebuilt.judgments = judgment_store(cases, judges = judges)
+    rebuilt.create_time_table()
+    pd.testing.assert_frame_equal(court.time_table, rebuilt.time_table)
+    court.create_time_table()
+    pd.testing.assert_frame_equal(court.time_table, rebuilt.time_table)
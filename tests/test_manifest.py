@@ -0,0 +1,80 @@
+"""
+Tests for incremental harvesting with HarvestManifest.
+"""
+import csv
+
+from courtpy.implements import HarvestManifest
+
+
+def write(path, text):
+    path.write_text(text, encoding = 'utf-8')
+    return str(path)
+
+
+def harvest(tmp_path, file_paths):
+    """Runs an incremental harvest of file_paths, with each row holding the
+    index number and the text of its file, and returns the pending files
+    and the rows of the output.
+    """
+    output_path = str(tmp_path / 'harvested_cases.csv')
+    manifest = HarvestManifest(
+            file_path = str(tmp_path / 'harvest_manifest.csv'),
+            output_path = output_path,
+            instruction_paths = [str(tmp_path / 'keywords.csv')],
+            encoding = 'utf-8')
+    pending = manifest.update(file_paths)
+    delta_path = output_path + '.delta'
+    with open(delta_path, mode = 'w', newline = '',
+              encoding = 'utf-8') as a_file:
+        writer = csv.writer(a_file)
+        writer.writerow(['index', 'text'])
+        for index_number, file_path in pending:
+            with open(file_path, encoding = 'utf-8') as case_file:
+                writer.writerow([index_number, case_file.read()])
+    manifest.merge(delta_path = delta_path)
+    with open(output_path, newline = '', encoding = 'utf-8') as a_file:
+        rows = list(csv.reader(a_file))[1:]
+    return pending, rows
+
+
+def test_only_changed_files_are_harvested_again(tmp_path):
+    write(tmp_path / 'keywords.csv', 'keys\nfirst\n')
+    cases = tmp_path / 'cases'
+    cases.mkdir()
+    paths = [write(cases / (name + '.txt'), 'opinion ' + name)
+             for name in ['a', 'b', 'c', 'd']]
+    pending, rows = harvest(tmp_path, paths)
+    assert [path for index, path in pending] == paths
+    assert rows == [['1', 'opinion a'], ['2', 'opinion b'],
+                    ['3', 'opinion c'], ['4', 'opinion d']]
+    pending, unchanged = harvest(tmp_path, paths)
+    assert pending == []
+    assert unchanged == rows
+    write(cases / 'b.txt', 'opinion b revised')
+    paths = paths[:2] + paths[3:] + [write(cases / 'e.txt', 'opinion e')]
+    pending, rows = harvest(tmp_path, paths)
+    assert pending == [(2, paths[1]), (5, paths[3])]
+    assert rows == [['1', 'opinion a'], ['2', 'opinion b revised'],
+                    ['4', 'opinion d'], ['5', 'opinion e']]
+
+
+def test_changed_instructions_harvest_every_file(tmp_path):
+    write(tmp_path / 'keywords.csv', 'keys\nfirst\n')
+    paths = [write(tmp_path / (name + '.txt'), 'opinion ' + name)
+             for name in ['a', 'b']]
+    harvest(tmp_path, paths)
+    write(tmp_path / 'keywords.csv', 'keys\nsecond\n')
+    pending, rows = harvest(tmp_path, paths)
+    assert pending == [(1, paths[0]), (2, paths[1])]
+    assert rows == [['1', 'opinion a'], ['2', 'opinion b']]
+
+
+def test_missing_output_harvests_every_file(tmp_path):
+    write(tmp_path / 'keywords.csv', 'keys\nfirst\n')
+    paths = [write(tmp_path / (name + '.txt'), 'opinion ' + name)
+             for name in ['a', 'b']]
+    harvest(tmp_path, paths)
+    (tmp_path / 'harvested_cases.csv').unlink()
+    pending, rows = harvest(tmp_path, paths)
+    assert [path for index, path in pending] == paths
+    assert len(rows) == 2
@@ -0,0 +1,68 @@
+"""
+Tests for matching on the unique values of a column.
+"""
+import numpy as np
+import pandas as pd
+
+from courtpy.implements import UniqueMatcher
+from courtpy.implements import matcher as matcher_module
+
+
+class LengthMatcher(object):
+    """Adds the length of each value of in_col and records how many values
+    it was run on.
+    """
+
+    def __init__(self):
+        self.matched = 0
+
+    def match(self, df, in_col, out_col = 'length'):
+        self.matched += len(df)
+        df[out_col] = [len(value) if isinstance(value, str) else -1
+                       for value in df[in_col]]
+        return df
+
+
+def test_results_are_broadcast_to_every_row():
+    df = pd.DataFrame({'party' : ['US', 'SMITH', 'US', np.nan, 'SMITH'],
+                       'length' : 0})
+    expected = LengthMatcher().match(df.copy(), in_col = 'party')
+    matcher = LengthMatcher()
+    result = UniqueMatcher(matcher = matcher,
+                           cache_key = 'broadcast').match(df,
+                                                          in_col = 'party')
+    assert matcher.matched == 3
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_cached_values_are_not_matched_again():
+    matcher = LengthMatcher()
+    unique_matcher = UniqueMatcher(matcher = matcher, cache_key = 'reuse')
+    first = pd.DataFrame({'party' : ['US', 'SMITH']})
+    second = pd.DataFrame({'party' : ['SMITH', 'JONES', 'US']})
+    unique_matcher.match(first, in_col = 'party')
+    result = unique_matcher.match(second, in_col = 'party')
+    assert matcher.matched == 3
+    assert result['length'].tolist() == [5, 5, 2]
+    other = unique_matcher.match(second, in_col = 'party',
+                                 out_col = 'size')
+    assert matcher.matched == 6
+    assert other['size'].tolist() == [5, 5, 2]
+
+
+def test_cache_is_bounded():
+    matcher = LengthMatcher()
+    unique_matcher = UniqueMatcher(matcher = matcher, cache_key = 'bounded',
+                                   cache_size = 4)
+    for start in range(0, 30, 3):
+        df = pd.DataFrame({'history' : ['case ' + str(i)
+                                        for i in range(start, start + 3)]})
+        unique_matcher.match(df, in_col = 'history')
+        cached = [value for key, value in matcher_module._results.items()
+                  if key[0] == 'bounded']
+        assert all(len(value) <= 4 for value in cached)
+    df = pd.DataFrame({'history' : ['case ' + str(i) for i in range(6)]})
+    result = unique_matcher.match(df, in_col = 'history')
+    assert result['length'].tolist() == [6] * 6
+    assert not [key for key in matcher_module._results
+                if key[0] == 'bounded']
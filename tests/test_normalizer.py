@@ -0,0 +1,62 @@
+"""
+Tests for the fused Lexis-Nexis text normalization.
+"""
+import random
+import re
+
+from courtpy.implements import normalize_lexis
+
+
+def chain_normalize_lexis(text):
+    """Returns text cleaned with a separate pass for each change, as
+    LexisSplit did before normalize_lexis.
+    """
+    text = text.replace('*', '')
+    text = re.sub(r'\[\d*\]', '', text)
+    text = re.sub(r'[^\S\n]', ' ', text)
+    text = re.sub(r' +', ' ', text)
+    text = re.sub(r'(?m)^Signal:.*\n?\n?', '', text)
+    text = re.sub(r'(?m)^SIGNAL:.*\n?\n?', '', text)
+    text = re.sub(r'(?m)^As of:.*\n?\n?', '', text)
+    text = re.sub(r'(?m)^AS OF:.*\n?\n?', '', text)
+    text = re.sub(r'\n ', '\n', text)
+    return text
+
+
+CORPUS = [
+    '',
+    'Plain text with no anomalies.\n',
+    'Star *paging* and [*12] page numbers [34] in text.',
+    'Tabs\tand  double   spaces\x0band\xa0other space.',
+    ' Leading space\n  indented line\n\n  \tmixed indent\n',
+    'Signal: As of: Jan 1, 2019\n\nUNITED STATES COURT OF APPEALS\n',
+    'As of: Mar 3, 2018\nSIGNAL: Caution\n\n\nOPINION\n\n Body text.',
+    'AS OF: stamp without a break',
+    'Header\nSignal: one\n\n\nAs of: two\n\nAS OF: three\n \nText',
+    '*[1] \n Signal: after stars\n\n body\n[2]*\n',
+    'Opinion text [*3] continued * here.\n\n\n  \nMore text.\r\n',
+    'Not a stamp: Signal: in the middle of a line.\n',
+    '[] empty brackets and [*] starred brackets [12*] mixed.',
+    'SIGNAL:\nAS OF:\n\nSignal:\n\n\nAs of:\n',
+]
+
+FRAGMENTS = ['Signal: stamp', 'SIGNAL: stamp', 'As of: date', 'AS OF: date',
+             '\n', '\n\n', ' ', '  ', '\t', '*', '[*5]', '[67]', '[]',
+             'OPINION', 'text', ' text', '\xa0', '\r\n', 'Signal', 'As of']
+
+
+def random_corpus(size = 2000, seed = 8):
+    generator = random.Random(seed)
+    return [''.join(generator.choice(FRAGMENTS)
+                    for _ in range(generator.randint(1, 25)))
+            for _ in range(size)]
+
+
+def test_normalize_lexis_matches_chain_on_fixed_corpus():
+    for text in CORPUS:
+        assert normalize_lexis(text) == chain_normalize_lexis(text), text
+
+
+def test_normalize_lexis_matches_chain_on_random_corpus():
+    for text in random_corpus():
+        assert normalize_lexis(text) == chain_normalize_lexis(text), text
@@ -0,0 +1,188 @@
+"""
+Tests for the panel arrays and helpers.
+"""
+import random
+
+import numpy as np
+import pandas as pd
+
+from courtpy.implements import PanelCleaner, clean_panel_column
+from courtpy.implements import explode_panel, panel_array, panel_tensor
+from courtpy.implements import VOTE_AUTHOR, VOTE_CONCUR, VOTE_DISSENT
+from courtpy.implements import vote_codes
+
+
+PANELS = pd.Series([['SMITH', 'JONES', 'LEE'],
+                    ['SMITH'],
+                    np.nan,
+                    ['BROWN', 'JONES'],
+                    [],
+                    ['LEE', 'SMITH', 'BROWN', 'JONES']],
+                   index = [10, 11, 12, 13, 14, 15])
+
+EXCESS = (r'(JUDGES|JUDGE|\:|BEFORE(?=\W)|SENIOR(?=\W)|CIRCUIT(?=\W)|'
+          r'CHIEF(?=\W)|DISTRICT|CONCURRING|DISSENTING|PER CURIAM|'
+          r'IN PART|BY(?=\W)|DESIGNATION|AND(?=\W)|JR(?=\W)|\d)')
+
+TEXTS = pd.Series(['Before: SMITH, JONES, and LEE, Circuit Judges.',
+                   "O'BRIEN, Chief Judge; ROE (sitting by designation)",
+                   '  Smith , Circuit Judge, concurring in part  ',
+                   np.nan,
+                   'PER CURIAM',
+                   '',
+                   'WILLIAMS, JR., Senior District Judge, dissenting.',
+                   'Before: SMITH, JONES, and LEE, Circuit Judges.'])
+
+
+def test_panel_array_pads_lists():
+    panel = panel_array(PANELS)
+    assert panel.shape == (6, 4)
+    assert list(panel[0, :3]) == ['SMITH', 'JONES', 'LEE']
+    assert pd.isna(panel[0, 3])
+    assert pd.isna(panel[2]).all()
+    assert pd.isna(panel[4]).all()
+    assert list(panel_array(PANELS, width = 2)[5]) == ['LEE', 'SMITH']
+
+
+def test_explode_panel_matches_apply():
+    df = pd.DataFrame({'year' : range(6), 'panel' : PANELS})
+    expected = df['panel'].apply(pd.Series)
+    expected = expected.rename(columns = lambda x : 'judge_name' + str(x + 1))
+    expected = pd.concat([df, expected], axis = 1)
+    result = explode_panel(df, in_col = 'panel', prefix = 'judge_name')
+    assert list(result.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(result.astype(object).fillna(''),
+                                  expected.astype(object).fillna(''))
+
+
+def chain_clean(column, excess):
+    """Returns column cleaned with the chain of replaces which PanelCleaner
+    replaced.
+    """
+    junk = '(@@|@ @|@ | @)'
+    column = (column.str.upper()
+                    .str.strip()
+                    .str.replace("[.']", '', regex = True)
+                    .str.replace(excess, '@', regex = True)
+                    .str.replace('[,()*;:]', '@', regex = True)
+                    .str.replace(junk, '@', regex = True)
+                    .str.replace(junk, '@', regex = True)
+                    .str.replace(junk, '@', regex = True))
+    return column.str.split('@', expand = False)
+
+
+def test_clean_panel_column_matches_chain():
+    expected = chain_clean(TEXTS, EXCESS)
+    result = clean_panel_column(column = TEXTS, excess = EXCESS)
+    assert result.index.equals(expected.index)
+    for names, expected_names in zip(result, expected):
+        if isinstance(expected_names, list):
+            assert names == expected_names
+        else:
+            assert pd.isna(names)
+
+
+def test_cleaner_memo_is_bounded():
+    cleaner = PanelCleaner(excess = EXCESS, memo_size = 2)
+    for text in TEXTS.dropna():
+        cleaner.clean(text)
+    assert len(cleaner.memo) <= 2
+    assert list(cleaner.clean(TEXTS[0])) == chain_clean(TEXTS, EXCESS)[0]
+
+
+def wide_judges():
+    return pd.DataFrame(
+            {'judge_name1' : ['SMITH', 'JONES', 'LEE', np.nan],
+             'judge_name2' : ['JONES', np.nan, 'SMITH', np.nan],
+             'judge_exp_woman1' : [True, False, True, np.nan],
+             'judge_exp_woman2' : [False, np.nan, True, np.nan],
+             'judge_ideo_party1' : [1.0, -1.0, np.nan, np.nan],
+             'judge_ideo_party2' : [-1.0, np.nan, 1.0, np.nan],
+             'judge_demo_age1' : [60, 55, 70, 0],
+             'judge_demo_age2' : [50, 45, 65, 0]},
+            index = [5, 6, 7, 8])
+
+
+def test_panel_tensor_totals_match_column_sums():
+    df = wide_judges()
+    stubs = ['judge_exp_woman', 'judge_ideo_party', 'judge_demo_age']
+    tensor = panel_tensor(df, stubs + ['judge_name'],
+                          mask_stub = 'judge_name')
+    assert tensor.features == stubs
+    totals = tensor.sum(stubs)
+    counts = tensor.count(stubs)
+    filled = df[['judge_name1', 'judge_name2']].notna().to_numpy()
+    for stub in stubs:
+        values = df[[stub + '1', stub + '2']].astype(float).to_numpy()
+        values = np.where(filled, values, np.nan)
+        assert np.allclose(totals[stub], np.nansum(values, axis = 1))
+        assert (counts[stub] == (~np.isnan(values)).sum(axis = 1)).all()
+    assert list(tensor.any(['judge_exp_woman'])['judge_exp_woman']) == [
+            True, False, True, False]
+
+
+def test_panel_tensor_round_trips_wide_columns():
+    df = wide_judges()
+    stubs = ['judge_name', 'judge_exp_woman', 'judge_ideo_party',
+             'judge_demo_age']
+    wide = panel_tensor(df, stubs).to_wide()
+    pd.testing.assert_frame_equal(wide[df.columns], df)
+
+
+def test_panel_tensor_long_rows_are_filled_positions():
+    df = wide_judges()
+    tensor = panel_tensor(df, ['judge_name', 'judge_demo_age'],
+                          mask_stub = 'judge_name')
+    long_df = tensor.to_long(position_col = 'position')
+    assert list(long_df.index) == [5, 5, 6, 7, 7]
+    assert list(long_df['judge_name']) == ['SMITH', 'JONES', 'JONES', 'LEE',
+                                           'SMITH']
+    assert list(long_df['position']) == [1, 2, 1, 1, 2]
+    assert list(long_df['judge_demo_age']) == [60, 50, 55, 70, 65]
+
+
+def loop_vote_codes(names, authors, concurs, dissents):
+    """Returns vote codes found by checking each judge against the opinions
+    of the same case.
+    """
+    votes = np.zeros(names.shape, dtype = np.int8)
+    for row in range(names.shape[0]):
+        for i, name in enumerate(names[row]):
+            if pd.isna(name):
+                continue
+            for flag, opinions in [(VOTE_AUTHOR, authors),
+                                   (VOTE_CONCUR, concurs),
+                                   (VOTE_DISSENT, dissents)]:
+                if name in list(opinions[row]):
+                    votes[row, i] |= flag
+    return votes
+
+
+def test_vote_codes_match_each_case():
+    generator = random.Random(19)
+    judges = ['SMITH', 'JONES', 'LEE', 'BROWN', 'DAVIS', 'GARCIA']
+    names = []
+    authors = []
+    concurs = []
+    dissents = []
+    for _ in range(500):
+        panel = generator.sample(judges, generator.randint(0, 3))
+        names.append(panel)
+        authors.append(generator.sample(judges, generator.randint(0, 1)))
+        concurs.append(generator.sample(judges, generator.randint(0, 2)))
+        dissents.append(generator.sample(judges, generator.randint(0, 2)))
+    arrays = [panel_array(lists, width = 3)
+              for lists in [names, authors, concurs, dissents]]
+    votes = vote_codes(*arrays)
+    assert votes.dtype == np.int8
+    assert (votes == loop_vote_codes(*arrays)).all()
+    assert (votes & VOTE_DISSENT).any()
+
+
+def test_opinions_in_other_cases_are_not_matched():
+    names = panel_array([['SMITH', 'JONES'], ['LEE', 'SMITH']])
+    authors = panel_array([['JONES'], ['LEE']])
+    concurs = panel_array([[], ['JONES']])
+    dissents = panel_array([['LEE'], ['SMITH']])
+    votes = vote_codes(names, authors, concurs, dissents)
+    assert votes.tolist() == [[0, VOTE_AUTHOR], [VOTE_AUTHOR, VOTE_DISSENT]]
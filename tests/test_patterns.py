@@ -0,0 +1,133 @@
+"""
+Tests for the PatternSet keyword engine.
+"""
+import os
+import random
+import re
+
+import pandas as pd
+
+from courtpy.implements import PatternSet
+from courtpy.implements.patterns import fold_case, required_literals
+
+
+INSTRUCTIONS = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                            'courtpy', 'instructions')
+
+FILE_PATHS = [os.path.join(INSTRUCTIONS, 'keywords_federal.csv'),
+              os.path.join(INSTRUCTIONS, 'parser_opinions_federal.csv')]
+
+
+def naive_rows(file_paths):
+    """Returns a (section, datatype, value, expression) tuple for each
+    instruction row, each with its own compiled expression.
+    """
+    naive = []
+    for file_path in file_paths:
+        rows = pd.read_csv(file_path, encoding = 'windows-1252',
+                           index_col = False)
+        rows = rows[rows['datatype'].isin(['bool', 'list', 'pattern',
+                                           'patterns'])]
+        for i, row in rows.dropna(subset = ['keys']).iterrows():
+            flags = 0
+            if row['dotall']:
+                flags |= re.DOTALL
+            if row['ignorecase']:
+                flags |= re.IGNORECASE
+            expression = re.compile(row['keys'], flags)
+            for section in str(row['section']).split(','):
+                naive.append((section.strip(), row['datatype'],
+                              str(row['values']), expression))
+    return naive
+
+
+def naive_match(rows, text):
+    """Returns the results of searching text for each of rows separately."""
+    df = pd.Series(dtype = object)
+    flags = {}
+    for section, datatype, value, expression in rows:
+        if datatype == 'bool':
+            column = section + '_' + value
+            flags[column] = (flags.get(column, False)
+                             or bool(expression.search(text)))
+        else:
+            if section not in df or not isinstance(df[section], list):
+                df[section] = []
+            df[section] = df[section] + expression.findall(text)
+    for column, result in flags.items():
+        df[column] = result
+    return df
+
+
+def sample_texts(pattern_set, size = 30, seed = 2):
+    """Returns texts made of the literals the loaded expressions require,
+    in mixed case, and filler words.
+    """
+    literals = [literal for entry in pattern_set.literals if entry[0]
+                for literal in entry[0]]
+    words = ['the', 'court', 'Judge', 'affirmed', 'REVERSED', '\n', ', ',
+             'concurring', 'dissenting', 'in part', 'Circuit', '.']
+    generator = random.Random(seed)
+    texts = []
+    for _ in range(size):
+        parts = []
+        for _ in range(generator.randint(5, 40)):
+            part = generator.choice(literals + words)
+            if generator.random() < 0.3:
+                part = part.upper()
+            parts.append(part)
+        texts.append(' '.join(parts))
+    return texts
+
+
+def test_match_is_same_as_separate_searches():
+    pattern_set = PatternSet(file_paths = FILE_PATHS)
+    rows = naive_rows(FILE_PATHS)
+    found = 0
+    for text in sample_texts(pattern_set):
+        expected = naive_match(rows, text)
+        result = pattern_set.match(df = pd.Series(dtype = object),
+                                   source = text)
+        assert result.to_dict() == expected.to_dict()
+        found += sum(value is True for value in expected)
+    assert found > 0
+
+
+def test_prefilter_skips_searches():
+    pattern_set = PatternSet(file_paths = FILE_PATHS)
+    pattern_set.scan('nothing of interest here')
+    assert pattern_set.prefilter_skips > 0
+
+
+def test_required_literals_are_in_every_match():
+    texts = ['Judge Smith, CIRCUIT JUDGE, dissenting',
+             'AFFIRMED in part and reversed in part',
+             'PER CURIAM: The judgment is vacated.']
+    patterns = [(r'dissent(ing)?', re.IGNORECASE),
+                (r'affirmed|reversed', re.IGNORECASE),
+                (r'PER CURIAM\:?', 0),
+                (r'circuit\s+judge', re.IGNORECASE),
+                (r'vacat(ed|e)', 0)]
+    for pattern, flags in patterns:
+        literals, exact = required_literals(pattern, flags)
+        assert literals
+        for text in texts:
+            if re.search(pattern, text, flags):
+                folded = fold_case(text) if flags & re.IGNORECASE else text
+                assert any(literal in folded for literal in literals)
+
+
+def test_rows_with_the_same_section_and_value_are_combined(tmp_path):
+    file_path = tmp_path / 'keywords.csv'
+    file_path.write_text(
+            'section,datatype,values,dotall,ignorecase,keys\n'
+            'civil,bool,foreclosure,False,True,foreclos\n'
+            'civil,bool,foreclosure,False,True,mortgagee\n'
+            'references,list,statute,False,False,\\d+ U\\.S\\.C\\.\n'
+            'references,list,statute,False,False,\\d+ C\\.F\\.R\\.\n')
+    pattern_set = PatternSet(file_paths = str(file_path))
+    result = pattern_set.match(
+            df = pd.Series(dtype = object),
+            source = 'A FORECLOSURE under 12 U.S.C. and 24 C.F.R.')
+    assert result['civil_foreclosure'] is True
+    assert result['references'] == ['12 U.S.C.', '24 C.F.R.']
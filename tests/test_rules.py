@@ -0,0 +1,70 @@
+"""
+Tests for compiled boolean column rules.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from courtpy.implements import RuleSet
+
+
+RULES_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                          'courtpy', 'instructions', 'combiner_rules.csv')
+
+
+def evaluate_rules(rules, df):
+    """Returns the columns created by rules, evaluating each rule on boolean
+    series in file order.
+    """
+    columns = {col : df[col].fillna(False).astype(bool) for col in df}
+    created = {}
+    for column, rule in rules:
+        created[column] = columns[column] = eval(rule, {}, columns)
+    return created
+
+
+def random_inputs(rule_set, rows, seed):
+    generator = np.random.default_rng(seed)
+    df = pd.DataFrame({name : generator.random(rows) < 0.5
+                       for name in rule_set.inputs})
+    df = df.astype(object)
+    df.iloc[::7, 0] = np.nan
+    return df
+
+
+@pytest.mark.parametrize('section', ['type', 'outcome'])
+def test_rules_match_separate_evaluation(section):
+    rule_set = RuleSet(file_path = RULES_PATH, section = section,
+                       chunk_rows = 37)
+    df = random_inputs(rule_set, rows = 1000, seed = len(section))
+    expected = evaluate_rules(rule_set.rules, df)
+    result = rule_set.evaluate(df)
+    assert list(result) == list(expected)
+    for column, values in expected.items():
+        assert (result[column] == values.to_numpy()).all(), column
+
+
+def test_shared_subexpressions_are_compiled_once(tmp_path):
+    rules_path = tmp_path / 'rules.csv'
+    rules_path.write_text('section,column,rule\n'
+                          'test,x,(a & b) | c\n'
+                          'test,y,~(b & a) ^ True\n'
+                          'test,a,x & ~~a\n')
+    rule_set = RuleSet(file_path = str(rules_path), section = 'test')
+    assert rule_set.nodes.count(('and', 0, 1)) == 1
+    df = pd.DataFrame({'a' : [True, True, False, False],
+                       'b' : [True, False, True, False],
+                       'c' : [False, True, False, True]})
+    result = rule_set.apply(df.copy())
+    assert result['x'].tolist() == [True, True, False, True]
+    assert result['y'].tolist() == [True, False, False, False]
+    assert result['a'].tolist() == [True, True, False, False]
+
+
+def test_unsupported_rules_are_rejected(tmp_path):
+    rules_path = tmp_path / 'rules.csv'
+    rules_path.write_text('section,column,rule\ntest,x,a + b\n')
+    with pytest.raises(ValueError):
+        RuleSet(file_path = str(rules_path), section = 'test')
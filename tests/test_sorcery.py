@@ -0,0 +1,89 @@
+"""
+Tests for bulk loads and queries of an SQLite database with Sorcery.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('sqlalchemy')
+
+from courtpy.entities import sorcery
+from courtpy.entities.sorcery import SQLITE_PRAGMAS, Sorcery
+
+
+@pytest.fixture
+def wizard(tmp_path):
+    url = sorcery.DATABASE['url']
+    sorcery.configure(url = 'sqlite:///' + str(tmp_path / 'courts.db'))
+    yield Sorcery(chunk_rows = 7, chunks_per_commit = 3,
+                  pragmas = SQLITE_PRAGMAS)
+    sorcery.configure(url = url)
+
+
+def random_cases(size = 200, seed = 24):
+    generator = np.random.default_rng(seed)
+    names = ['Adams', 'Baker', 'Clark', 'Davis']
+    return pd.DataFrame({
+            'number' : np.arange(size),
+            'court' : generator.choice(['ca1', 'ca2'], size),
+            'year' : generator.integers(1990, 2000, size),
+            'judge_name1' : generator.choice(names, size),
+            'judge_name2' : generator.choice(names + [None], size),
+            'unused' : 0})
+
+
+def pragma(name):
+    with sorcery.get_engine().connect() as connection:
+        cursor = connection.connection.cursor()
+        cursor.execute('PRAGMA ' + name)
+        value = cursor.fetchone()[0]
+        cursor.close()
+    return value
+
+
+def test_bulk_load_restores_indexes_and_settings(wizard):
+    cases = random_cases()
+    journal_mode = pragma('journal_mode')
+    rate = wizard.bulk_load('judgments', cases)
+    assert rate > 0 and wizard.load_rates['judgments'] == rate
+    assert pragma('journal_mode') == journal_mode
+    inspector = sorcery.db.inspect(sorcery.get_engine())
+    indexes = [index['name'] for index in inspector.get_indexes('judgments')]
+    assert 'ix_judgments_court_year' in indexes
+    with pytest.raises(Exception):
+        wizard.bulk_load('judgments', cases.iloc[:10])
+    indexes = [index['name'] for index in inspector.get_indexes('judgments')]
+    assert 'ix_judgments_court_year' in indexes
+    assert pragma('journal_mode') == journal_mode
+
+
+def test_judgments_match_dataframe_slices(wizard):
+    cases = random_cases()
+    wizard.bulk_load('judgments', cases)
+    wizard.bulk_load_panels(cases)
+    result = wizard.judgments(judge = 'Baker', start_year = 1993,
+                              end_year = 1996)
+    panel = (cases['judge_name1'] == 'Baker') | (cases['judge_name2']
+                                                 == 'Baker')
+    years = cases['year'].between(1993, 1996)
+    assert result['number'].tolist() == sorted(
+            cases.loc[panel & years, 'number'],
+            key = lambda number: (cases.loc[number, 'year'], number))
+    result = wizard.judgments(court = 'ca2')
+    assert sorted(result['number']) == list(
+            cases.loc[cases['court'] == 'ca2', 'number'])
+    chunks = list(wizard.judgments(court = 'ca2', chunk_rows = 9))
+    assert all(len(chunk) <= 9 for chunk in chunks)
+    pd.testing.assert_frame_equal(
+            pd.concat(chunks, ignore_index = True), result)
+
+
+def test_writes_clear_cached_results(wizard):
+    cases = random_cases(size = 20)
+    wizard.bulk_load('judgments', cases.iloc[:10])
+    assert len(wizard.judgments(court = 'ca1')) == sum(
+            cases['court'].iloc[:10] == 'ca1')
+    wizard.add_records('judgments', {'number' : 100, 'court' : 'ca1',
+                                     'year' : 1995})
+    assert len(wizard.judgments(court = 'ca1')) == sum(
+            cases['court'].iloc[:10] == 'ca1') + 1
@@ -0,0 +1,86 @@
+"""
+Tests for the batched case writer.
+"""
+import csv
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+from courtpy.implements import BatchWriter
+
+
+COLUMNS = ['index', 'court_num', 'text']
+
+
+def series_list(size):
+    return [pd.Series({'index' : i, 'court_num' : 1000 + i % 3,
+                       'text' : 'opinion, "quoted" ' + str(i)})
+            for i in range(size)]
+
+
+def test_csv_batches_write_every_row_in_order(tmp_path):
+    file_path = str(tmp_path / 'harvested_cases.csv')
+    writer = BatchWriter(file_path = file_path, column_list = COLUMNS,
+                         batch_rows = 4, encoding = 'utf-8')
+    for series in series_list(10):
+        writer.save(series = series)
+    writer.close()
+    assert writer.batches_written == 3
+    assert writer.rows_written == 10
+    with open(file_path, newline = '', encoding = 'utf-8') as a_file:
+        rows = list(csv.reader(a_file))
+    assert rows[0] == COLUMNS
+    assert rows[1:] == [[str(s['index']), str(s['court_num']), s['text']]
+                        for s in series_list(10)]
+
+
+def test_csv_batches_by_bytes(tmp_path):
+    writer = BatchWriter(file_path = str(tmp_path / 'cases.csv'),
+                         column_list = COLUMNS, batch_rows = 1000,
+                         batch_bytes = 60, encoding = 'utf-8')
+    for series in series_list(6):
+        writer.save(series = series)
+    writer.close()
+    assert writer.batches_written > 1
+    assert writer.rows_written == 6
+
+
+def test_parquet_parts_have_every_row(tmp_path):
+    pytest.importorskip('pyarrow')
+    file_path = str(tmp_path / 'harvested_cases.parquet')
+    writer = BatchWriter(file_path = file_path, column_list = COLUMNS,
+                         file_format = 'parquet', batch_rows = 4)
+    for series in series_list(10):
+        writer.save(series = series)
+    writer.close()
+    folder = os.path.splitext(file_path)[0]
+    assert sorted(os.listdir(folder)) == ['part-00000.parquet',
+                                          'part-00001.parquet',
+                                          'part-00002.parquet']
+    df = pd.read_parquet(folder)
+    assert df['text'].tolist() == [s['text'] for s in series_list(10)]
+
+
+def test_failed_parquet_part_is_removed(tmp_path, monkeypatch):
+    pytest.importorskip('pyarrow')
+
+    def fail(self, path, **kwargs):
+        path.write(b'partial')
+        raise OSError('disk full')
+
+    monkeypatch.setattr(pd.DataFrame, 'to_parquet', fail)
+    writer = BatchWriter(file_path = str(tmp_path / 'cases.parquet'),
+                         column_list = COLUMNS, file_format = 'parquet',
+                         batch_rows = 1)
+    with pytest.raises(OSError):
+        writer.save(series = series_list(1)[0])
+    assert os.listdir(str(tmp_path / 'cases')) == []
+
+
+def test_parquet_without_pyarrow_fails_on_creation(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    with pytest.raises(ImportError):
+        BatchWriter(file_path = str(tmp_path / 'cases.parquet'),
+                    column_list = COLUMNS, file_format = 'parquet')
@@ -0,0 +1,48 @@
+"""
+Tests for year-keyed lookup tables.
+"""
+import numpy as np
+import pandas as pd
+
+from courtpy.implements import YearTable
+
+
+def external_df():
+    return pd.DataFrame({'year' : [1980, 1981, 1982, 1982, 1990, 1975],
+                         'president' : ['Carter', 'Reagan', 'Reagan',
+                                        'Reagan II', 'Bush', 'Ford'],
+                         'senate_dem' : [58, 46, 46, 45, 55, 61]})
+
+
+def test_apply_matches_dictionary_lookups():
+    external = external_df()
+    dicts = {'president' : ['year', 'president'],
+             'senate_dem' : ['year', 'senate_dem'],
+             'skipped' : ['court_num', 'senate_dem']}
+    table = YearTable(start_year = 1980, end_year = 1990)
+    table.add_dicts(df = external, dicts = dicts)
+    assert list(table.columns) == ['president', 'senate_dem']
+    cases = pd.DataFrame({'year' : [1982, 1990, 1975, 1985, np.nan, 1980,
+                                    '1981', 2000]},
+                         index = list('abcdefgh'))
+    result = table.apply(cases, year_col = 'year')
+    for name, (key_col, value_col) in list(dicts.items())[:2]:
+        mapping = dict(zip(external[key_col], external[value_col]))
+        expected = [mapping.get(year) if year in range(1980, 1991) else None
+                    for year in pd.to_numeric(cases['year'])]
+        values = result['politics_' + name].tolist()
+        for value, expected_value in zip(values, expected):
+            if expected_value is None:
+                assert pd.isna(value)
+            else:
+                assert value == expected_value
+    assert list(result.index) == list(cases.index)
+
+
+def test_numeric_tables_are_floats():
+    table = YearTable(start_year = 2000, end_year = 2002, prefix = '')
+    table.add_values('seats', [2000, 2002], [10, 12])
+    lookup = table.lookup([2002, 2001, 2000])
+    assert lookup['seats'].dtype == float
+    assert lookup['seats'].tolist()[::2] == [12.0, 10.0]
+    assert np.isnan(lookup['seats'][1])